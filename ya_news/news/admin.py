@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Comment, News
+from .models import BadWord, Comment, News
 
 
 class CommentInline(admin.StackedInline):
@@ -13,3 +13,21 @@ class NewsAdmin(admin.ModelAdmin):
     inlines = [
         CommentInline,
     ]
+    readonly_fields = ('comment_count',)
+
+    def save_model(self, request, obj, form, change):
+        """
+        Сохраняет только изменённые поля новости.
+
+        Счётчик комментариев меняется сигналами, перезаписывать его
+        значением, прочитанным при открытии формы, нельзя.
+        """
+        if change:
+            obj.save(update_fields=form.changed_data)
+        else:
+            obj.save()
+
+
+@admin.register(BadWord)
+class BadWordAdmin(admin.ModelAdmin):
+    search_fields = ('word',)
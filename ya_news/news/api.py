@@ -0,0 +1,189 @@
+from functools import wraps
+
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import condition, require_safe
+
+from .cache import get_comments_version, get_home_version
+from .models import Comment, News
+from .pagination import (
+    INVALID_CURSOR, comes_after, decode_cursor, decode_date_cursor,
+    make_cursor, make_date_cursor
+)
+
+# Поля ответа и соответствующие им выражения для values_list.
+NEWS_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'date': 'date',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'news': 'news_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+    'updated': 'updated',
+}
+
+
+def api_view(view):
+    """Отдаёт ошибки запроса в JSON, а не страницей."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404 as error:
+            return json_response({'error': str(error)}, status=404)
+        except BadRequest as error:
+            return json_response({'error': str(error)}, status=400)
+    return wrapper
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, json_dumps_params={'ensure_ascii': False}
+    )
+
+
+def parse_fields(request, allowed):
+    """
+    Поля из параметра `fields`, например `?fields=title,date`.
+
+    Без параметра отдаются все поля; id отдаётся всегда.
+    """
+    value = request.GET.get('fields')
+    if not value:
+        return list(allowed)
+    fields = list(dict.fromkeys(
+        ['id'] + [field for field in value.split(',') if field]
+    ))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise BadRequest(f'Неизвестные поля: {", ".join(unknown)}.')
+    return fields
+
+
+def parse_limit(request):
+    maximum = settings.API_MAX_PAGE_SIZE
+    error = f'limit должен быть от 1 до {maximum}.'
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest(error)
+    if not 1 <= limit <= maximum:
+        raise BadRequest(error)
+    return limit
+
+
+def parse_cursor(request, decode):
+    """
+    Курсор из параметра `cursor` или None.
+
+    Некорректный курсор - ошибка запроса, а не отсутствующая страница.
+    """
+    value = request.GET.get('cursor')
+    if not value:
+        return None
+    try:
+        return decode(value)
+    except Http404:
+        raise BadRequest(INVALID_CURSOR)
+
+
+def select(queryset, fields, lookups):
+    """
+    Строки выборки в виде словарей с запрошенными полями.
+
+    Используется values_list: объекты моделей не создаются, а в запрос
+    попадают только нужные столбцы.
+    """
+    return [
+        dict(zip(fields, row))
+        for row in queryset.values_list(*(lookups[name] for name in fields))
+    ]
+
+
+def cursor_page(queryset, fields, lookups, key, limit, encode):
+    """
+    Страница выборки, упорядоченной по (key, id), и курсор следующей.
+
+    Поле `key` читается, даже если его не запросили: из него строится
+    курсор.
+    """
+    names = fields if key in fields else fields + [key]
+    rows = select(queryset[:limit + 1], names, lookups)
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode(rows[-1][key], rows[-1]['id'])
+    if key not in fields:
+        for row in rows:
+            del row[key]
+    return {'results': rows, 'next_cursor': next_cursor}
+
+
+def news_etag(request, *args, **kwargs):
+    """Версия главной меняется при записи новостей и комментариев."""
+    return get_home_version()
+
+
+def comments_etag(request, pk):
+    return get_comments_version(pk)
+
+
+@require_safe
+@condition(etag_func=news_etag)
+@api_view
+def news_list(request):
+    """Новости от новых к старым с курсором по (date, id)."""
+    fields = parse_fields(request, NEWS_FIELDS)
+    limit = parse_limit(request)
+    queryset = News.objects.order_by('-date', '-id')
+    cursor = parse_cursor(request, decode_date_cursor)
+    if cursor:
+        day, pk = cursor
+        queryset = queryset.filter(
+            Q(date__lte=day) & (Q(date__lt=day) | Q(pk__lt=pk))
+        )
+    return json_response(cursor_page(
+        queryset, fields, NEWS_FIELDS, 'date', limit, make_date_cursor
+    ))
+
+
+@require_safe
+@condition(etag_func=news_etag)
+@api_view
+def news_detail(request, pk):
+    fields = parse_fields(request, NEWS_FIELDS)
+    rows = select(News.objects.filter(pk=pk), fields, NEWS_FIELDS)
+    if not rows:
+        raise Http404('Новость не найдена.')
+    return json_response(rows[0])
+
+
+@require_safe
+@condition(etag_func=comments_etag)
+@api_view
+def comment_thread(request, pk):
+    """
+    Комментарии новости от старых к новым с курсором по (created, id).
+
+    Существование новости проверяется, только если страница пуста.
+    """
+    fields = parse_fields(request, COMMENT_FIELDS)
+    limit = parse_limit(request)
+    queryset = Comment.objects.filter(news_id=pk).order_by('created', 'id')
+    cursor = parse_cursor(request, decode_cursor)
+    if cursor:
+        queryset = queryset.filter(comes_after(*cursor))
+    page = cursor_page(
+        queryset, fields, COMMENT_FIELDS, 'created', limit, make_cursor
+    )
+    if not page['results'] and not News.objects.filter(pk=pk).exists():
+        raise Http404('Новость не найдена.')
+    return json_response(page)
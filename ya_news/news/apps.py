@@ -1,7 +1,19 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class NewsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'news'
     verbose_name = 'Новости'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='news_sqlite_pragmas'
+        )
+        if settings.TEMPLATES_WARM_UP:
+            from .templating import warm_up_templates
+            warm_up_templates()
@@ -0,0 +1,90 @@
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import home_etag, home_last_modified
+from .routers import replica_reads
+from .views import NewsComment, NewsDetail, NewsList
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def _reads(view):
+    return replica_reads() if view.use_replica() else nullcontext()
+
+
+def _load_home_page(view):
+    """
+    Всё, что главной странице нужно от базы.
+
+    Пользователь загружается здесь же: шаблон и ETag его используют,
+    а в цикле событий обращаться к базе нельзя.
+    """
+    request = view.request
+    with _reads(view):
+        request.user.is_authenticated
+        etag = quote_etag(home_etag(request))
+        last_modified = home_last_modified(request)
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=last_modified and last_modified.timestamp(),
+        )
+        if response is not None:
+            return etag, last_modified, response, None
+        view.object_list = list(view.get_queryset())
+        return etag, last_modified, None, view.get_context_data()
+
+
+def _load_detail_page(view):
+    """Новость, страница комментариев и пользователь."""
+    with _reads(view):
+        view.request.user.is_authenticated
+        view.object = view.get_object()
+        return view.get_context_data(object=view.object)
+
+
+async def news_list(request):
+    """
+    Асинхронная версия NewsList.
+
+    В Django 3.2 нет асинхронного ORM, поэтому запросы к базе выполняются
+    одним переходом в поток, а условный GET и рендеринг шаблона - в цикле
+    событий.
+    """
+    if request.method not in READ_METHODS:
+        return HttpResponseNotAllowed(READ_METHODS)
+    view = NewsList()
+    view.setup(request)
+    etag, last_modified, response, context = await sync_to_async(
+        _load_home_page
+    )(view)
+    if response is None:
+        response = render(request, view.template_name, context)
+    response.headers.setdefault('ETag', etag)
+    if last_modified:
+        response.headers.setdefault(
+            'Last-Modified', http_date(last_modified.timestamp())
+        )
+    return response
+
+
+async def news_detail(request, pk):
+    """
+    Асинхронная версия NewsDetailView.
+
+    Страница новости загружается как в news_list, а отправка комментария
+    остаётся синхронной.
+    """
+    if request.method == 'POST':
+        return await sync_to_async(NewsComment.as_view())(request, pk=pk)
+    if request.method not in READ_METHODS:
+        return HttpResponseNotAllowed(READ_METHODS + ('POST',))
+    view = NewsDetail()
+    view.setup(request, pk=pk)
+    context = await sync_to_async(_load_detail_page)(view)
+    return render(request, view.template_name, context)
@@ -0,0 +1,188 @@
+"""
+Нагрузочный прогон WSGI-приложения.
+
+Команда bench_wsgi наследует BenchCommand и задаёт только адреса для
+замера и описание данных в базе. Копия модуля в соседнем проекте
+(news/benchmarking.py и notes/benchmarking.py) должна оставаться такой же.
+"""
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from wsgiref.util import setup_testing_defaults
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import get_internal_wsgi_application
+from django.test import Client
+from django.test.utils import override_settings
+
+
+def make_environ(path, cookie=None):
+    """Окружение WSGI для GET-запроса; path может содержать строку запроса."""
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'wsgi.input': BytesIO(),
+    }
+    if cookie:
+        environ['HTTP_COOKIE'] = cookie
+    setup_testing_defaults(environ)
+    return environ
+
+
+def call(application, environ):
+    """Выполняет запрос, дочитывает ответ и возвращает код статуса."""
+    status = None
+
+    def start_response(value, headers, exc_info=None):
+        nonlocal status
+        status = int(value.split()[0])
+
+    result = application(dict(environ), start_response)
+    try:
+        for _ in result:
+            pass
+    finally:
+        if hasattr(result, 'close'):
+            result.close()
+    return status
+
+
+def timed_call(application, environ):
+    started = time.perf_counter()
+    status = call(application, environ)
+    return status, (time.perf_counter() - started) * 1000
+
+
+def allocations(application, environ, repeat):
+    """Средний пик памяти, выделенной за один запрос, в КБ."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(repeat):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            call(application, environ)
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    return statistics.mean(peaks) / 1024
+
+
+def summarize(statuses, timings, seconds):
+    """Пропускная способность и перцентили времени ответа в мс."""
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'requests': len(timings),
+        'errors': sum(1 for status in statuses if status != 200),
+        'rps': round(len(timings) / seconds, 1),
+        'p50_ms': round(cuts[49], 2),
+        'p95_ms': round(cuts[94], 2),
+        'p99_ms': round(cuts[98], 2),
+    }
+
+
+def compare(result, baseline):
+    """Изменение показателей относительно прошлого прогона, в процентах."""
+    for name, current in result['endpoints'].items():
+        previous = baseline['endpoints'].get(name)
+        if previous is None:
+            continue
+        current['change_pct'] = {
+            key: round((current[key] / previous[key] - 1) * 100, 1)
+            for key in ('rps', 'p50_ms', 'p95_ms', 'p99_ms', 'alloc_kb')
+            if previous.get(key)
+        }
+
+
+def session_cookie(user):
+    """Cookie сессии, в которой вошёл `user`."""
+    client = Client()
+    client.force_login(user)
+    session = client.cookies[settings.SESSION_COOKIE_NAME]
+    return f'{session.key}={session.value}'
+
+
+class BenchCommand(ABC, BaseCommand):
+    """
+    Нагружает WSGI-приложение внутри процесса из пула потоков.
+
+    Выводит JSON с запросами в секунду, p50/p95/p99 и выделенной памятью
+    по каждому адресу из endpoints().
+    """
+    # Замер каждого ответа мешал бы сравнивать прогоны.
+    settings_overrides = {'PERFORMANCE_SAMPLE_RATE': 0}
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument(
+            '--requests', type=int, default=1000,
+            help='Запросов на каждый адрес.'
+        )
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument(
+            '--alloc-requests', type=int, default=20,
+            help='Запросов на адрес для замера памяти, без пула потоков.'
+        )
+        parser.add_argument(
+            '--output', default='-', help='Файл для JSON, "-" - вывод.'
+        )
+        parser.add_argument(
+            '--baseline', help='JSON прошлого прогона для сравнения.'
+        )
+
+    def handle(self, *args, **options):
+        with override_settings(**self.settings_overrides):
+            application = get_internal_wsgi_application()
+            result = {
+                'application': settings.WSGI_APPLICATION,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'threads': options['threads'],
+                'data': self.data(),
+                'endpoints': {
+                    name: self.measure(application, environ, options)
+                    for name, environ in self.endpoints().items()
+                },
+            }
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as stream:
+                compare(result, json.load(stream))
+        output = json.dumps(result, ensure_ascii=False, indent=2)
+        if options['output'] == '-':
+            self.stdout.write(output)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as stream:
+                stream.write(output + '\n')
+
+    @abstractmethod
+    def data(self):
+        """Объём данных в базе: число строк основных таблиц."""
+
+    @abstractmethod
+    def endpoints(self):
+        """Окружения WSGI для замера по именам адресов, см. make_environ."""
+
+    def measure(self, application, environ, options):
+        for _ in range(options['warmup']):
+            call(application, environ)
+        with ThreadPoolExecutor(options['threads']) as pool:
+            started = time.perf_counter()
+            statuses, timings = zip(*pool.map(
+                lambda _: timed_call(application, environ),
+                range(options['requests']),
+            ))
+            seconds = time.perf_counter() - started
+        result = summarize(statuses, timings, seconds)
+        result['alloc_kb'] = round(
+            allocations(application, environ, options['alloc_requests']), 1
+        )
+        return result
@@ -0,0 +1,148 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .pagination import EPOCH, MICROSECOND
+
+HOME_VERSION_KEY = 'news:home:version'
+HOME_CHANGED_RECENTLY_KEY = 'news:home:changed_recently'
+BAD_WORDS_VERSION_KEY = 'news:bad_words:version'
+COMMENT_HTML_KEY = 'news:comment:{pk}:{updated}'
+NEWS_FEED_VERSION_KEY = 'news:feed:news:version'
+COMMENTS_VERSION_KEY = 'news:comments:{pk}:version'
+
+
+def make_version():
+    """
+    Новая версия: случайная часть и время создания в микросекундах.
+
+    Время хранится в самой версии и служит Last-Modified: отдельные
+    ключи на каждую версию копились бы в кэше.
+    """
+    return f'{uuid4().hex}-{(timezone.now() - EPOCH) // MICROSECOND}'
+
+
+def version_time(version):
+    """
+    Время создания версии, см. make_version.
+
+    У версий, сохранённых без времени, им считается текущее.
+    """
+    _, separator, microseconds = version.rpartition('-')
+    if not separator:
+        return timezone.now()
+    return EPOCH + timedelta(microseconds=int(microseconds))
+
+
+def get_version(key):
+    """
+    Возвращает текущую версию данных, хранящуюся под ключом `key`.
+
+    Версия - случайная строка, а не счётчик: если ключ вытеснен из кэша,
+    новая версия не совпадёт ни с одной из старых, а её время будет
+    текущим, поэтому клиенты не получат устаревший ответ 304.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, make_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Делает недействительными все значения, закэшированные по версии."""
+    cache.set(key, make_version(), None)
+
+
+def get_home_version():
+    return get_version(HOME_VERSION_KEY)
+
+
+def bump_home_version():
+    """
+    Меняет версию главной страницы.
+
+    Пока реплика может отставать, главная читается с основной базы,
+    иначе новая версия закэшировалась бы с устаревшими данными.
+    """
+    bump_version(HOME_VERSION_KEY)
+    cache.set(HOME_CHANGED_RECENTLY_KEY, True, settings.NEWS_REPLICA_LAG)
+
+
+def home_changed_recently():
+    return cache.get(HOME_CHANGED_RECENTLY_KEY, False)
+
+
+def get_news_feed_version():
+    return get_version(NEWS_FEED_VERSION_KEY)
+
+
+def get_comments_version(pk):
+    """Версия комментариев новости `pk` для её ленты и API."""
+    return get_version(COMMENTS_VERSION_KEY.format(pk=pk))
+
+
+def bump_news_feed_version():
+    bump_version(NEWS_FEED_VERSION_KEY)
+
+
+def bump_news_feeds(pk):
+    """Сбрасывает ленту новостей и версию комментариев новости `pk`."""
+    bump_news_feed_version()
+    bump_comments_version(pk)
+
+
+def bump_comments_version(pk):
+    bump_version(COMMENTS_VERSION_KEY.format(pk=pk))
+
+
+def get_home_last_modified():
+    """
+    Время последнего изменения главной страницы - время её версии.
+
+    Версия меняется при любой записи, поэтому учитываются и удаления,
+    и правки.
+    """
+    return version_time(get_home_version())
+
+
+def home_etag(request, *args, **kwargs):
+    """Значение ETag главной: версия страницы и id пользователя."""
+    return f'{get_home_version()}-{request.user.pk or 0}'
+
+
+def home_last_modified(request, *args, **kwargs):
+    """Last-Modified главной страницы."""
+    return get_home_last_modified()
+
+
+def render_comments(comments):
+    """
+    Добавляет комментариям атрибут html с их готовой разметкой.
+
+    Разметка кэшируется по id и времени изменения комментария и для всей
+    страницы читается одним get_many. Ссылки, зависящие от пользователя,
+    в неё не входят.
+    """
+    keys = {
+        COMMENT_HTML_KEY.format(
+            pk=comment.pk, updated=comment.updated.isoformat()
+        ): comment
+        for comment in comments
+    }
+    fragments = cache.get_many(keys)
+    missing = [key for key in keys if key not in fragments]
+    if missing:
+        template = get_template('includes/comment.html')
+        rendered = {
+            key: template.render({'comment': keys[key]}) for key in missing
+        }
+        cache.set_many(rendered, settings.COMMENTS_CACHE_TIMEOUT)
+        fragments.update(rendered)
+    for key, comment in keys.items():
+        comment.html = mark_safe(fragments[key])
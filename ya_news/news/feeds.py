@@ -0,0 +1,174 @@
+import json
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import feedgenerator, timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.utils.text import Truncator
+
+from .cache import get_comments_version, get_news_feed_version, version_time
+from .models import News
+
+FEED_KEY = 'news:feed:{name}:{format}:{origin}:{version}'
+GENERATORS = {
+    'rss': feedgenerator.Rss201rev2Feed,
+    'atom': feedgenerator.Atom1Feed,
+}
+CONTENT_TYPES = {
+    'rss': 'application/rss+xml; charset=utf-8',
+    'atom': 'application/atom+xml; charset=utf-8',
+    'json': 'application/feed+json; charset=utf-8',
+}
+JSON_FEED_VERSION = 'https://jsonfeed.org/version/1.1'
+READ_METHODS = ('GET', 'HEAD')
+TITLE_WORDS = 10
+
+
+def serialize(fmt, feed, items):
+    """Лента в формате RSS 2.0, Atom 1.0 или JSON Feed 1.1."""
+    if fmt == 'json':
+        return json.dumps({
+            'version': JSON_FEED_VERSION,
+            'title': feed['title'],
+            'home_page_url': feed['link'],
+            'feed_url': feed['feed_url'],
+            'description': feed['description'],
+            'language': settings.LANGUAGE_CODE,
+            'items': [
+                {
+                    'id': item['unique_id'],
+                    'url': item['link'],
+                    'title': item['title'],
+                    'content_text': item['description'],
+                    'date_published': item['pubdate'].isoformat(),
+                    'date_modified': item['updateddate'].isoformat(),
+                    **(
+                        {'authors': [{'name': item['author_name']}]}
+                        if item.get('author_name') else {}
+                    ),
+                }
+                for item in items
+            ],
+        }, ensure_ascii=False).encode()
+    generator = GENERATORS[fmt](language=settings.LANGUAGE_CODE, **feed)
+    for item in items:
+        generator.add_item(**item)
+    return generator.writeString('utf-8').encode()
+
+
+def build_news_feed(request):
+    """Последние новости, одним запросом."""
+    items = []
+    for news in News.objects.only('title', 'text', 'date')[
+        :settings.FEED_ITEMS_COUNT
+    ]:
+        published = timezone.make_aware(datetime.combine(news.date, time.min))
+        link = request.build_absolute_uri(
+            reverse('news:detail', args=(news.pk,))
+        )
+        items.append({
+            'title': news.title,
+            'link': link,
+            'description': news.text,
+            'unique_id': link,
+            'pubdate': published,
+            'updateddate': published,
+        })
+    return {
+        'title': 'YaNews',
+        'link': request.build_absolute_uri(reverse('news:home')),
+        'description': 'Последние новости',
+        'feed_url': request.build_absolute_uri(),
+    }, items
+
+
+def build_comments_feed(request, pk):
+    """Последние комментарии к новости вместе с именами авторов."""
+    news = get_object_or_404(News.objects.only('title'), pk=pk)
+    items = []
+    for comment in news.comment_set.select_related('author').order_by(
+        '-created', '-pk'
+    )[:settings.FEED_ITEMS_COUNT]:
+        link = request.build_absolute_uri(comment.get_absolute_url())
+        items.append({
+            'title': Truncator(comment.text).words(TITLE_WORDS),
+            'link': link,
+            'description': comment.text,
+            'unique_id': link,
+            'pubdate': comment.created,
+            'updateddate': comment.updated,
+            'author_name': comment.author.get_username(),
+        })
+    return {
+        'title': f'Комментарии: {news.title}',
+        'link': request.build_absolute_uri(
+            reverse('news:detail', args=(news.pk,))
+        ),
+        'description': f'Последние комментарии к новости «{news.title}»',
+        'feed_url': request.build_absolute_uri(),
+    }, items
+
+
+def cached_feed(request, fmt, name, version, build, *args):
+    """
+    Готовая лента из кэша.
+
+    Лента хранится по версии, которую меняют сигналы News и Comment,
+    поэтому база запрашивается один раз на изменение. Ссылки в ленте
+    абсолютные, поэтому в ключ входят схема и хост запроса.
+    """
+    key = FEED_KEY.format(
+        name=name, format=fmt, version=version,
+        origin=f'{request.scheme}://{request.get_host()}',
+    )
+    content = cache.get(key)
+    if content is None:
+        content = serialize(fmt, *build(request, *args))
+        cache.set(key, content, settings.FEEDS_CACHE_TIMEOUT)
+    return content
+
+
+def feed_response(request, fmt, name, version, build, *args):
+    """
+    Отдаёт ленту или 304 по If-None-Match и If-Modified-Since.
+
+    ETag - версия ленты, Last-Modified - время её смены: оно учитывает
+    и удаления, которых не видно по датам оставшихся записей. Повторный
+    опрос без изменений стоит чтения кэша и не обращается к базе.
+    """
+    if request.method not in READ_METHODS:
+        return HttpResponseNotAllowed(READ_METHODS)
+    if fmt not in CONTENT_TYPES:
+        raise Http404('Неизвестный формат ленты.')
+    etag = quote_etag(f'{version}-{fmt}')
+    # Заголовок передаёт время с точностью до секунды.
+    last_modified = int(version_time(version).timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(
+            cached_feed(request, fmt, name, version, build, *args),
+            content_type=CONTENT_TYPES[fmt],
+        )
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def news_feed(request, fmt):
+    return feed_response(
+        request, fmt, 'news', get_news_feed_version(), build_news_feed
+    )
+
+
+def comments_feed(request, pk, fmt):
+    return feed_response(
+        request, fmt, f'comments:{pk}', get_comments_version(pk),
+        build_comments_feed, pk
+    )
@@ -1,16 +1,27 @@
 from django.forms import ModelForm
 from django.core.exceptions import ValidationError
 
-from .models import Comment
+from .cache import BAD_WORDS_VERSION_KEY
+from .models import BadWord, Comment
+from .profanity import RefreshingBadWordsMatcher
 
 BAD_WORDS = (
     'редиска',
     'негодяй',
-    # Дополните список на своё усмотрение.
+    # Остальные слова добавляются через админку (модель BadWord).
 )
 WARNING = 'Не ругайтесь!'
 
 
+def load_bad_words():
+    return BAD_WORDS + tuple(BadWord.objects.values_list('word', flat=True))
+
+
+bad_words_matcher = RefreshingBadWordsMatcher(
+    load_bad_words, BAD_WORDS_VERSION_KEY
+)
+
+
 class CommentForm(ModelForm):
 
     class Meta:
@@ -20,8 +31,6 @@ class CommentForm(ModelForm):
     def clean_text(self):
         """Не позволяем ругаться в комментариях."""
         text = self.cleaned_data['text']
-        lowered_text = text.lower()
-        for word in BAD_WORDS:
-            if word in lowered_text:
-                raise ValidationError(WARNING)
+        if bad_words_matcher.find(text):
+            raise ValidationError(WARNING)
         return text
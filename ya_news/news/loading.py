@@ -0,0 +1,154 @@
+import json
+import re
+from collections import namedtuple
+from datetime import date
+
+from django.db import transaction
+
+from .cache import bump_home_version, bump_news_feed_version
+from .models import News
+
+READ_CHUNK_SIZE = 64 * 1024
+# Объект длиннее этого числа символов считается ошибкой ленты: иначе
+# незакрытый объект читался бы в память до конца потока.
+MAX_ITEM_SIZE = 1024 * 1024
+ARRAY_SEPARATORS = re.compile(r'[\s,]*')
+WHITESPACE = re.compile(r'\s*')
+
+
+class LoadResult(namedtuple('LoadResult', ('read', 'created', 'updated'))):
+
+    def add(self, batch):
+        """Сохраняет пачку новостей и возвращает обновлённый итог."""
+        created, updated = save_batch(batch)
+        return LoadResult(
+            self.read + len(batch),
+            self.created + created,
+            self.updated + updated,
+        )
+
+
+def iter_items(stream, chunk_size=READ_CHUNK_SIZE):
+    """
+    Выдаёт объекты из JSON-массива или NDJSON по одному.
+
+    Поток читается кусками по `chunk_size` символов, поэтому в памяти
+    находится не больше одного куска и одного разбираемого объекта
+    размером до MAX_ITEM_SIZE. Формат определяется по первому символу:
+    `[` - массив, иначе NDJSON. В ошибках указывается номер символа
+    потока, с которого начинается некорректный объект.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = '', 0
+    # Сколько символов потока уже отброшено из начала буфера.
+    consumed = 0
+    separators = None
+    eof = False
+    while True:
+        position = (separators or WHITESPACE).match(buffer, position).end()
+        if position < len(buffer):
+            if separators is None:
+                is_array = buffer[position] == '['
+                separators = ARRAY_SEPARATORS if is_array else WHITESPACE
+                position += is_array
+                continue
+            if separators is ARRAY_SEPARATORS and buffer[position] == ']':
+                return
+            try:
+                item, position = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError as error:
+                if eof:
+                    raise ValueError(
+                        f'Некорректный JSON в символе '
+                        f'{consumed + error.pos}: {error.msg}'
+                    )
+                if len(buffer) - position > MAX_ITEM_SIZE:
+                    raise ValueError(
+                        f'Объект с символа {consumed + position} длиннее '
+                        f'{MAX_ITEM_SIZE} символов.'
+                    )
+            else:
+                yield item
+                continue
+        elif eof:
+            return
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        consumed += position
+        buffer, position = buffer[position:] + chunk, 0
+
+
+def news_fields(item):
+    """
+    Возвращает поля новости из элемента ленты.
+
+    Элемент может быть записью фикстуры Django (с ключом `fields`)
+    или просто объектом с полями новости.
+    """
+    if not isinstance(item, dict):
+        raise ValueError('Элемент ленты должен быть объектом.')
+    fields = item.get('fields', item)
+    try:
+        news_date = fields.get('date')
+        return {
+            'title': fields['title'],
+            'text': fields['text'],
+            'date': (
+                date.fromisoformat(news_date) if news_date
+                else date.today()
+            ),
+        }
+    except (KeyError, TypeError, ValueError) as error:
+        raise ValueError(f'Некорректная новость {item!r}: {error}')
+
+
+def save_batch(batch):
+    """
+    Добавляет новые и обновляет существующие новости из пачки.
+
+    Новость считается существующей, если совпадают заголовок и дата.
+    Возвращает число созданных и обновлённых новостей.
+    """
+    by_key = {(fields['title'], fields['date']): fields for fields in batch}
+    existing = {
+        (news.title, news.date): news
+        for news in News.objects.filter(
+            title__in={title for title, _ in by_key},
+            date__in={news_date for _, news_date in by_key},
+        ).only('id', 'title', 'date', 'text')
+    }
+    to_create, to_update = [], []
+    for key, fields in by_key.items():
+        news = existing.get(key)
+        if news is None:
+            to_create.append(News(**fields))
+        elif news.text != fields['text']:
+            news.text = fields['text']
+            to_update.append(news)
+    with transaction.atomic():
+        News.objects.bulk_create(to_create)
+        News.objects.bulk_update(to_update, ('text',))
+    return len(to_create), len(to_update)
+
+
+def load_news(items, batch_size):
+    """
+    Загружает новости пачками по `batch_size`, каждую в своей транзакции.
+
+    Повторная загрузка той же ленты не создаёт дубликатов. Возвращает
+    число прочитанных, созданных и обновлённых новостей.
+    """
+    result = LoadResult(0, 0, 0)
+    batch = []
+    for item in items:
+        batch.append(news_fields(item))
+        if len(batch) >= batch_size:
+            result = result.add(batch)
+            batch = []
+    if batch:
+        result = result.add(batch)
+    if result.created or result.updated:
+        # bulk_create и bulk_update не отправляют сигналы моделей.
+        transaction.on_commit(bump_home_version)
+        transaction.on_commit(bump_news_feed_version)
+    return result
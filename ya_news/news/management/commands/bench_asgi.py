@@ -0,0 +1,141 @@
+import asyncio
+import random
+import statistics
+import time
+from importlib import import_module, reload
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from django.urls import clear_url_caches
+
+from news.models import Comment, News
+
+User = get_user_model()
+TITLE_PREFIX = 'bench-asgi'
+
+
+def reload_urls():
+    clear_url_caches()
+    reload(import_module('news.urls'))
+    reload(import_module(settings.ROOT_URLCONF))
+
+
+async def get(application, path):
+    """Выполняет GET-запрос к ASGI-приложению и возвращает статус ответа."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    status = None
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает синхронные и асинхронные версии главной и страницы '
+        'новости под ASGI: запросы идут в приложение внутри процесса с '
+        'заданным числом одновременных клиентов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=20)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        news_ids = self.create_data(options)
+        try:
+            for is_async in (False, True):
+                with override_settings(
+                    NEWS_ASYNC_VIEWS=is_async, NEWS_REPLICA_DATABASE=None
+                ):
+                    reload_urls()
+                    timings, errors, seconds = asyncio.run(
+                        self.run_load(news_ids, options)
+                    )
+                self.report(
+                    'Асинхронные' if is_async else 'Синхронные',
+                    timings, errors, seconds
+                )
+        finally:
+            reload_urls()
+            News.objects.filter(title__startswith=TITLE_PREFIX).delete()
+            User.objects.filter(username=TITLE_PREFIX).delete()
+
+    def create_data(self, options):
+        """Данные должны быть закоммичены: запросы идут из других потоков."""
+        author, _ = User.objects.get_or_create(username=TITLE_PREFIX)
+        News.objects.bulk_create(
+            News(title=f'{TITLE_PREFIX} {index}', text='Текст')
+            for index in range(options['news'])
+        )
+        news_ids = list(News.objects.filter(
+            title__startswith=TITLE_PREFIX
+        ).values_list('id', flat=True))
+        Comment.objects.bulk_create(
+            Comment(news_id=news_id, author=author, text='Комментарий')
+            for news_id in news_ids
+            for _ in range(options['comments'])
+        )
+        News.objects.rebuild_comment_counts()
+        return news_ids
+
+    async def run_load(self, news_ids, options):
+        application = get_asgi_application()
+        generator = random.Random(options['seed'])
+        paths = [
+            '/' if index % 2 else f'/news/{generator.choice(news_ids)}/'
+            for index in range(options['requests'])
+        ]
+        timings, errors = [], 0
+
+        async def client():
+            nonlocal errors
+            while paths:
+                path = paths.pop()
+                started = time.perf_counter()
+                if await get(application, path) != 200:
+                    errors += 1
+                timings.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            client() for _ in range(options['concurrency'])
+        ))
+        return timings, errors, time.perf_counter() - started
+
+    def report(self, name, timings, errors, seconds):
+        timings.sort()
+        p99 = timings[int(len(timings) * 0.99) - 1]
+        self.stdout.write(
+            f'{name}: запросов/с={len(timings) / seconds:.0f} '
+            f'p50={statistics.median(timings):.1f} мс p99={p99:.1f} мс '
+            f'ошибок={errors}'
+        )
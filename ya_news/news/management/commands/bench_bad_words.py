@@ -0,0 +1,71 @@
+import random
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from news.profanity import BadWordsMatcher
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+
+
+def naive_find(words, text):
+    """Прежняя проверка: отдельный поиск подстроки для каждого слова."""
+    lowered_text = text.lower()
+    return {word for word in words if word in lowered_text}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает скорость проверки комментария на запрещённые слова '
+        'поиском подстрок и через BadWordsMatcher.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10, 1000, 10000],
+            help='Размеры списка запрещённых слов.'
+        )
+        parser.add_argument(
+            '--text-size', type=int, default=10 * 1024,
+            help='Длина комментария в символах.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=5,
+            help='Сколько раз повторять каждый замер.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        generator = random.Random(options['seed'])
+
+        def random_word(min_length, max_length):
+            return ''.join(
+                generator.choice(ALPHABET)
+                for _ in range(generator.randint(min_length, max_length))
+            )
+
+        text = ''
+        while len(text) < options['text_size']:
+            text += random_word(2, 10) + ' '
+        text = text[:options['text_size']]
+        self.stdout.write(
+            f'{"слов":>8} {"подстроки, мс":>15} {"matcher, мс":>13} '
+            f'{"сборка, мс":>12}'
+        )
+        for size in options['sizes']:
+            words = {random_word(6, 12) for _ in range(size)}
+            build = timeit.timeit(lambda: BadWordsMatcher(words), number=1)
+            matcher = BadWordsMatcher(words)
+            assert matcher.find(text) <= naive_find(words, text)
+            naive = min(timeit.repeat(
+                lambda: naive_find(words, text),
+                number=1, repeat=options['repeat']
+            ))
+            compiled = min(timeit.repeat(
+                lambda: matcher.find(text),
+                number=1, repeat=options['repeat']
+            ))
+            self.stdout.write(
+                f'{size:>8} {naive * 1000:>15.2f} {compiled * 1000:>13.2f} '
+                f'{build * 1000:>12.2f}'
+            )
@@ -0,0 +1,98 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+
+from news.cache import render_comments
+from news.models import Comment, News
+
+User = get_user_model()
+
+# Цикл по комментариям в том виде, в каком он был в detail.html до
+# кэширования разметки.
+INLINE_TEMPLATE = """
+{% for comment in comments %}
+  <div id="comment_{{ comment.pk }}">
+    <b>{{ comment.author }}</b>, {{ comment.created }}</b>
+    <p class="mb-0">{{ comment.text|linebreaksbr }}</p>
+    {% if comment.author == user %}
+      <a href="{% url 'news:edit' comment.pk %}">Редактировать</a>
+    {% endif %}
+  </div>
+{% endfor %}
+"""
+CACHED_TEMPLATE = """
+{% for comment in comments %}
+  <div id="comment_{{ comment.pk }}">
+    {{ comment.html }}
+    {% if comment.author == user %}
+      <a href="{% url 'news:edit' comment.pk %}">Редактировать</a>
+    {% endif %}
+  </div>
+{% endfor %}
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет рендеринг ветки комментариев без кэша разметки, с пустым '
+        'и с заполненным кэшем. Данные создаются во временной транзакции '
+        'и откатываются после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=1000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        engine = engines['django']
+        inline = engine.from_string(INLINE_TEMPLATE)
+        cached = engine.from_string(CACHED_TEMPLATE)
+        with transaction.atomic():
+            author = User.objects.create(username='bench-comment-html')
+            news = News.objects.create(title='Новость', text='Текст')
+            Comment.objects.bulk_create(
+                Comment(
+                    news=news,
+                    author=author,
+                    text=f'Комментарий {index}\nВторая строка',
+                )
+                for index in range(options['comments'])
+            )
+            reader = User.objects.create(username='bench-comment-reader')
+            comments = list(news.comment_set.select_related('author'))
+            context = {'comments': comments, 'user': reader}
+
+            def render_inline():
+                inline.render(context)
+
+            def render_cold():
+                cache.clear()
+                render_comments(comments)
+                cached.render(context)
+
+            def render_warm():
+                render_comments(comments)
+                cached.render(context)
+
+            for name, render in (
+                ('Без кэша разметки', render_inline),
+                ('Пустой кэш', render_cold),
+                ('Заполненный кэш', render_warm),
+            ):
+                self.report(name, render, options['repeat'])
+            transaction.set_rollback(True)
+
+    def report(self, name, render, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render()
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f'{name}: медиана {statistics.median(timings):.1f} мс'
+        )
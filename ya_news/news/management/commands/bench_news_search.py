@@ -0,0 +1,120 @@
+import random
+import statistics
+import time
+from itertools import accumulate
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.management.commands.generate_news import WORDS
+from news.models import Comment, News
+from news.search import search
+
+User = get_user_model()
+VOCABULARY_SIZE = 20000
+LETTERS = 'абвгдежзиклмнопрстуфхцчшэюя'
+# Частоты слов в текстах убывают по закону Ципфа: самые частые слова
+# встречаются в заметной доле комментариев, как и в живых данных.
+ZIPF_EXPONENT = 1.0
+TARGET_MS = 50
+
+
+def make_vocabulary(generator):
+    """
+    Частые слова новостей и случайные редкие слова после них.
+
+    Редкие слова не имеют общих начал вида `словоN`, при которых поиск
+    по префиксу находил бы тысячи разных слов сразу.
+    """
+    vocabulary = dict.fromkeys(WORDS)
+    while len(vocabulary) < VOCABULARY_SIZE:
+        vocabulary.setdefault(''.join(generator.choices(
+            LETTERS, k=generator.randint(4, 10)
+        )))
+    return list(vocabulary)
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    p95 = timings[max(int(len(timings) * 0.95) - 1, 0)]
+    return (
+        f'p50={statistics.median(timings):.2f} p95={p95:.2f} '
+        f'max={timings[-1]:.2f}'
+    ), p95
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время поиска по новостям и комментариям. Данные '
+        'создаются во временной транзакции и откатываются после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=2_000_000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        generator = random.Random(options['seed'])
+        vocabulary = make_vocabulary(generator)
+        weights = list(accumulate(
+            1 / rank ** ZIPF_EXPONENT
+            for rank in range(1, len(vocabulary) + 1)
+        ))
+
+        def words(count):
+            return ' '.join(
+                generator.choices(vocabulary, cum_weights=weights, k=count)
+            )
+
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            started = time.perf_counter()
+            author = User.objects.create(username='bench-search')
+            News.objects.bulk_create(
+                (News(title=words(5), text=words(80))
+                 for _ in range(options['news'])),
+                batch_size=batch_size,
+            )
+            news_ids = list(News.objects.values_list('id', flat=True))
+            for start in range(0, options['comments'], batch_size):
+                Comment.objects.bulk_create(
+                    Comment(
+                        news_id=generator.choice(news_ids),
+                        author=author,
+                        text=words(20),
+                    )
+                    for _ in range(
+                        min(batch_size, options['comments'] - start)
+                    )
+                )
+            self.stdout.write(
+                f'Создано новостей: {options["news"]}, комментариев: '
+                f'{options["comments"]} за '
+                f'{time.perf_counter() - started:.1f} с'
+            )
+            # Запросы подчиняются тому же распределению, что и тексты,
+            # поэтому частые слова ищутся чаще и замеряются отдельно.
+            timings, common = [], []
+            for _ in range(options['queries']):
+                query = words(1)
+                started = time.perf_counter()
+                search(query, 0, settings.NEWS_SEARCH_RESULTS_ON_PAGE + 1)
+                timings.append((time.perf_counter() - started) * 1000)
+                if query.lower() in WORDS:
+                    common.append(timings[-1])
+            transaction.set_rollback(True)
+        summary, p95 = percentiles(timings)
+        self.stdout.write(f'Поиск, мс: {summary}')
+        if common:
+            summary, common_p95 = percentiles(common)
+            self.stdout.write(
+                f'Частые слова ({len(common)} запросов), мс: {summary}'
+            )
+            p95 = max(p95, common_p95)
+        style = self.style.SUCCESS if p95 < TARGET_MS else self.style.ERROR
+        self.stdout.write(style(f'Цель p95 < {TARGET_MS} мс'))
@@ -0,0 +1,148 @@
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from news.db import pragma_statements
+
+SCHEMA = (
+    'CREATE TABLE news (id INTEGER PRIMARY KEY, title TEXT, date TEXT, '
+    'comment_count INTEGER NOT NULL DEFAULT 0)',
+    'CREATE INDEX news_date_id_idx ON news (date, id)',
+    'CREATE TABLE comment (id INTEGER PRIMARY KEY, news_id INTEGER, '
+    'text TEXT, created TEXT)',
+    'CREATE INDEX comment_news_created_idx ON comment (news_id, created)',
+)
+HOME_SQL = (
+    'SELECT id, title, comment_count FROM news '
+    'ORDER BY date DESC, id DESC LIMIT 10'
+)
+COMMENTS_SQL = (
+    'SELECT id, text FROM comment WHERE news_id = ? '
+    'ORDER BY created, id LIMIT 50'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность SQLite при одновременном чтении '
+        'и записи: без настроек и с SQLITE_PRAGMAS и постоянными '
+        'соединениями. Работает с временным файлом базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('По умолчанию', [], False),
+            ('Настроенный', pragma_statements(settings.SQLITE_PRAGMAS), True),
+        )
+        for name, pragmas, persistent in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                self.fill(path, options)
+                reads, writes, errors = self.run_load(
+                    path, pragmas, persistent, options
+                )
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{name}: чтений/с={reads / seconds:.0f} '
+                f'записей/с={writes / seconds:.0f} ошибок={errors}'
+            )
+
+    def fill(self, path, options):
+        generator = random.Random(options['seed'])
+        with sqlite3.connect(path) as database:
+            for statement in SCHEMA:
+                database.execute(statement)
+            database.executemany(
+                'INSERT INTO news (id, title, date) VALUES (?, ?, ?)',
+                ((index, f'Новость {index}', f'2024-01-{index % 28 + 1:02}')
+                 for index in range(1, options['news'] + 1)),
+            )
+            database.executemany(
+                'INSERT INTO comment (news_id, text, created) '
+                'VALUES (?, ?, ?)',
+                ((generator.randint(1, options['news']), 'Текст', str(index))
+                 for index in range(options['comments'])),
+            )
+        database.close()
+
+    def run_load(self, path, pragmas, persistent, options):
+        deadline = time.perf_counter() + options['seconds']
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+
+        def connect():
+            database = sqlite3.connect(path, isolation_level=None)
+            for statement in pragmas:
+                database.execute(statement)
+            return database
+
+        def worker(operation, counter, seed):
+            generator = random.Random(seed)
+            database = connect() if persistent else None
+            done = failed = 0
+            while time.perf_counter() < deadline:
+                current = database or connect()
+                try:
+                    operation(current, generator.randint(1, options['news']))
+                    done += 1
+                except sqlite3.OperationalError:
+                    failed += 1
+                finally:
+                    if not persistent:
+                        current.close()
+            if database is not None:
+                database.close()
+            with lock:
+                counters[counter] += done
+                counters['errors'] += failed
+
+        threads = [
+            threading.Thread(target=worker, args=(read, 'reads', index))
+            for index in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=(write, 'writes', -index))
+            for index in range(1, options['writers'] + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counters['reads'], counters['writes'], counters['errors']
+
+
+def read(database, news_id):
+    """Запросы главной страницы и страницы новости."""
+    database.execute(HOME_SQL).fetchall()
+    database.execute(COMMENTS_SQL, (news_id,)).fetchall()
+
+
+def write(database, news_id):
+    """Добавление комментария вместе с обновлением счётчика."""
+    database.execute('BEGIN IMMEDIATE')
+    try:
+        database.execute(
+            'INSERT INTO comment (news_id, text, created) VALUES (?, ?, ?)',
+            (news_id, 'Новый', str(time.time())),
+        )
+        database.execute(
+            'UPDATE news SET comment_count = comment_count + 1 WHERE id = ?',
+            (news_id,),
+        )
+        database.execute('COMMIT')
+    except sqlite3.Error:
+        database.execute('ROLLBACK')
+        raise
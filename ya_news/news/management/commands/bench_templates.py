@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from news.models import Comment, News
+from news.templating import warm_up_templates
+from yanews import settings_production
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время ответа страниц с загрузчиками шаблонов из '
+        'настроек и с кэширующим загрузчиком из settings_production. '
+        'Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=20)
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('Загрузчики из настроек', settings.TEMPLATES, False),
+            ('Кэширующий загрузчик', settings_production.TEMPLATES, True),
+        )
+        with transaction.atomic():
+            pages = self.create_pages(options)
+            for name, templates, warm_up in profiles:
+                with override_settings(
+                    TEMPLATES=templates, NEWS_REPLICA_DATABASE=None
+                ):
+                    started = time.perf_counter()
+                    if warm_up:
+                        warm_up_templates()
+                    self.stdout.write(
+                        f'{name}, подготовка '
+                        f'{(time.perf_counter() - started) * 1000:.1f} мс:'
+                    )
+                    self.measure(pages, options['requests'])
+            transaction.set_rollback(True)
+
+    def create_pages(self, options):
+        author = User.objects.create(username='bench-templates')
+        news = News.objects.create(title='Новость', text='Текст')
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text=f'Комментарий {index}')
+            for index in range(options['comments'])
+        )
+        client = Client(SERVER_NAME='localhost')
+        client.force_login(author)
+        return {
+            'home': (client, reverse('news:home')),
+            'detail': (client, reverse('news:detail', args=[news.pk])),
+            'search': (client, reverse('news:search') + '?q=Текст'),
+            'login': (Client(SERVER_NAME='localhost'),
+                      reverse('users:login')),
+        }
+
+    def measure(self, pages, requests):
+        for name, (client, url) in pages.items():
+            timings = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'  {name}: первый запрос {timings[0]:.2f} мс, '
+                f'медиана {statistics.median(timings[1:]):.2f} мс'
+            )
@@ -0,0 +1,58 @@
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.urls import reverse
+
+from news.benchmarking import BenchCommand, make_environ, session_cookie
+from news.models import Comment, News
+
+User = get_user_model()
+
+SEARCH_QUERY = 'город'
+
+
+class Command(BenchCommand):
+    help = (
+        'Нагружает WSGI-приложение внутри процесса из пула потоков и '
+        'выводит JSON с запросами в секунду, p50/p95/p99 и выделенной '
+        'памятью по каждому адресу. Работает с данными текущей базы, '
+        'их создаёт команда generate_news.'
+    )
+    # Реплика и замер каждого ответа мешали бы сравнивать прогоны.
+    settings_overrides = {
+        **BenchCommand.settings_overrides, 'NEWS_REPLICA_DATABASE': None
+    }
+
+    def data(self):
+        return {
+            'users': User.objects.count(),
+            'news': News.objects.count(),
+            'comments': Comment.objects.count(),
+        }
+
+    def endpoints(self):
+        popular = News.objects.order_by('-comment_count').first()
+        if popular is None:
+            raise CommandError('Нет новостей: запустите generate_news.')
+        typical = News.objects.order_by('comment_count')[
+            News.objects.count() // 2
+        ]
+        commenter = User.objects.annotate(
+            comments=Count('comment')
+        ).order_by('-comments').first()
+        popular_url = reverse('news:detail', args=(popular.pk,))
+        return {
+            'home': make_environ(reverse('news:home')),
+            'detail_popular': make_environ(popular_url),
+            'detail_typical': make_environ(
+                reverse('news:detail', args=(typical.pk,))
+            ),
+            'detail_popular_user': make_environ(
+                popular_url, session_cookie(commenter)
+            ),
+            'search': make_environ(
+                f'{reverse("news:search")}?{urlencode({"q": SEARCH_QUERY})}'
+            ),
+        }
@@ -0,0 +1,148 @@
+import random
+import time
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.cache import bump_home_version, bump_news_feed_version
+from news.models import Comment, News
+from news.recent import rebuild_recent_comments
+
+User = get_user_model()
+
+WORDS = (
+    'город', 'новость', 'погода', 'выборы', 'спорт', 'матч', 'команда',
+    'рынок', 'курс', 'цена', 'школа', 'дорога', 'мост', 'парк', 'театр',
+    'фестиваль', 'концерт', 'выставка', 'проект', 'закон', 'суд', 'врач',
+    'больница', 'транспорт', 'метро', 'трамвай', 'снег', 'дождь', 'лето',
+    'зима', 'учёные', 'открытие', 'работа', 'зарплата', 'налог', 'бюджет',
+    'жители', 'район', 'ремонт', 'строительство', 'интервью', 'мнение',
+)
+# Средняя давность новости в днях и наибольшая давность.
+NEWS_AGE_MEAN_DAYS = 30
+NEWS_AGE_MAX_DAYS = 365
+# Чем меньше, тем сильнее внимание сосредоточено на немногих новостях
+# и немногих активных комментаторах.
+POPULARITY_SHAPE = 1.2
+
+
+def words(generator, mean):
+    """Текст с логнормальным числом слов: много коротких, мало длинных."""
+    count = max(1, round(generator.lognormvariate(0, 0.8) * mean))
+    return ' '.join(generator.choices(WORDS, k=count)).capitalize()
+
+
+def created_ids(model, objects):
+    """
+    Ключи строк, только что созданных bulk_create.
+
+    SQLite в Django 3.2 не возвращает ключи из bulk_create, поэтому
+    берутся последние ключи таблицы: команда не рассчитана на
+    одновременную запись в те же таблицы.
+    """
+    if objects and objects[0].pk is not None:
+        return [instance.pk for instance in objects]
+    return list(model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    )[:len(objects)])
+
+
+def popularity(generator, count):
+    """Накопленные веса по закону Парето для random.choices."""
+    return list(accumulate(
+        generator.paretovariate(POPULARITY_SHAPE) for _ in range(count)
+    ))
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей, новости и комментарии для '
+        'нагрузочных замеров. Даты новостей тяготеют к сегодняшнему дню, '
+        'комментарии и их авторы распределены по закону Парето.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--news', type=int, default=1000)
+        parser.add_argument('--comments', type=int, default=50_000)
+        parser.add_argument('--prefix', default='synthetic')
+        parser.add_argument(
+            '--password', default='password',
+            help='Пароль всех созданных пользователей.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        generator = random.Random(options['seed'])
+        started = time.perf_counter()
+        with transaction.atomic():
+            user_ids = self.create_users(options)
+            news_ids = self.create_news(generator, options)
+            self.create_comments(generator, user_ids, news_ids, options)
+            News.objects.filter(pk__in=news_ids).rebuild_comment_counts()
+            # bulk_create не отправляет сигналы, которые ведут ленту
+            # обсуждений и сбрасывают кэш главной и ленты новостей.
+            rebuild_recent_comments()
+            transaction.on_commit(bump_home_version)
+            transaction.on_commit(bump_news_feed_version)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(user_ids)}, новостей: {len(news_ids)}, '
+            f'комментариев: {options["comments"]}, '
+            f'{time.perf_counter() - started:.1f} с'
+        ))
+
+    def create_users(self, options):
+        prefix = options['prefix']
+        first = User.objects.filter(username__startswith=prefix).count()
+        # Хэш считается один раз: он самая дорогая часть создания.
+        password = make_password(options['password'])
+        return created_ids(User, User.objects.bulk_create(
+            (
+                User(username=f'{prefix}-{index}', password=password)
+                for index in range(first, first + options['users'])
+            ),
+            batch_size=options['batch_size'],
+        ))
+
+    def create_news(self, generator, options):
+        today = date.today()
+        return created_ids(News, News.objects.bulk_create(
+            (
+                News(
+                    title=words(generator, 4)[:50],
+                    text=words(generator, 80),
+                    date=today - timedelta(days=min(
+                        int(generator.expovariate(1 / NEWS_AGE_MEAN_DAYS)),
+                        NEWS_AGE_MAX_DAYS,
+                    )),
+                )
+                for _ in range(options['news'])
+            ),
+            batch_size=options['batch_size'],
+        ))
+
+    def create_comments(self, generator, user_ids, news_ids, options):
+        if not user_ids or not news_ids:
+            return
+        news_weights = popularity(generator, len(news_ids))
+        author_weights = popularity(generator, len(user_ids))
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    news_id=generator.choices(
+                        news_ids, cum_weights=news_weights
+                    )[0],
+                    author_id=generator.choices(
+                        user_ids, cum_weights=author_weights
+                    )[0],
+                    text=words(generator, 15),
+                )
+                for _ in range(options['comments'])
+            ),
+            batch_size=options['batch_size'],
+        )
@@ -0,0 +1,40 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from news.loading import iter_items, load_news
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает новости из JSON-массива или NDJSON, не читая файл '
+        'целиком. Новости с теми же заголовком и датой обновляются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Путь к файлу, "-" - стандартный ввод.'
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            if options['path'] == '-':
+                result = load_news(
+                    iter_items(sys.stdin), options['batch_size']
+                )
+            else:
+                with open(options['path'], encoding='utf-8') as stream:
+                    result = load_news(
+                        iter_items(stream), options['batch_size']
+                    )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Прочитано: {result.read}, создано: {result.created}, '
+            f'обновлено: {result.updated}, {elapsed:.1f} с, '
+            f'{result.read / elapsed:.0f} строк/с'
+        ))
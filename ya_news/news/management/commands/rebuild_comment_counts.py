@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from news.models import News
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у всех новостей.'
+
+    def handle(self, *args, **options):
+        updated = News.objects.rebuild_comment_counts()
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено новостей: {updated}')
+        )
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from news.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовые индексы новостей и комментариев.'
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Поисковые индексы перестроены.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from news.recent import rebuild_recent_comments
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет ленту последних комментариев заново. Нужна после '
+        'загрузки комментариев в обход сигналов, например bulk_create.'
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild_recent_comments()
+        self.stdout.write(
+            self.style.SUCCESS(f'Комментариев в ленте: {count}')
+        )
@@ -0,0 +1,38 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from news.db import copy_sqlite_database
+from news.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в реплику. С --interval повторяет '
+        'копирование, изображая реплику, отстающую на этот интервал.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Пауза между копиями в секундах; 0 - скопировать один раз.'
+        )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError('Реплика не настроена.')
+        databases = settings.DATABASES
+        for name in (DEFAULT_DB_ALIAS, alias):
+            if databases[name]['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError('Копировать можно только базы SQLite.')
+        source = databases[DEFAULT_DB_ALIAS]['NAME']
+        target = databases[alias]['NAME']
+        while True:
+            copy_sqlite_database(source, target)
+            self.stdout.write(f'Реплика обновлена: {time.strftime("%X")}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
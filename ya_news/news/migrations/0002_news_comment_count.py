@@ -0,0 +1,33 @@
+# Generated by Django 3.2.15 on 2026-10-18 05:32
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counts(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    Comment = apps.get_model('news', 'Comment')
+    counts = Comment.objects.filter(
+        news=models.OuterRef('pk')
+    ).order_by().values('news').annotate(
+        count=models.Count('pk')
+    ).values('count')
+    News.objects.update(
+        comment_count=Coalesce(models.Subquery(counts), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_comment_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,64 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+# SQLite добавляет столбец, пересоздавая таблицу, и теряет её триггеры.
+COMMENT_TRIGGERS_SQL = (
+    """
+    CREATE TRIGGER IF NOT EXISTS news_comment_fts_insert
+    AFTER INSERT ON news_comment BEGIN
+        INSERT INTO news_comment_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS news_comment_fts_delete
+    AFTER DELETE ON news_comment BEGIN
+        INSERT INTO news_comment_fts(news_comment_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS news_comment_fts_update
+    AFTER UPDATE OF text ON news_comment BEGIN
+        INSERT INTO news_comment_fts(news_comment_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO news_comment_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+)
+
+
+def restore_comment_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in COMMENT_TRIGGERS_SQL:
+        schema_editor.execute(statement)
+
+
+def fill_updated(apps, schema_editor):
+    Comment = apps.get_model('news', 'Comment')
+    Comment.objects.update(updated=models.F('created'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0005_search_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_comment_triggers
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated',
+            field=models.DateTimeField(
+                auto_now=True, default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            restore_comment_triggers, migrations.RunPython.noop
+        ),
+        migrations.RunPython(fill_updated, migrations.RunPython.noop),
+    ]
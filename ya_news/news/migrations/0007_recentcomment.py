@@ -0,0 +1,52 @@
+# Generated by Django 3.2.15 on 2026-10-18 06:13
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_recent_comments(apps, schema_editor):
+    Comment = apps.get_model('news', 'Comment')
+    RecentComment = apps.get_model('news', 'RecentComment')
+    comments = Comment.objects.select_related('news', 'author').order_by(
+        '-pk'
+    )[:settings.RECENT_COMMENTS_LIMIT]
+    RecentComment.objects.bulk_create(
+        RecentComment(
+            comment=comment,
+            news_id=comment.news_id,
+            news_title=comment.news.title,
+            author_id=comment.author_id,
+            author_name=comment.author.username,
+            text=comment.text,
+            created=comment.created,
+        )
+        for comment in comments
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('news', '0006_comment_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecentComment',
+            fields=[
+                ('comment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recent', serialize=False, to='news.comment')),
+                ('news_title', models.CharField(max_length=50)),
+                ('author_name', models.CharField(max_length=150)),
+                ('text', models.TextField()),
+                ('created', models.DateTimeField()),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('news', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='news.news')),
+            ],
+            options={
+                'ordering': ('-pk',),
+            },
+        ),
+        migrations.RunPython(fill_recent_comments, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+from django.db import migrations
+
+# Без индекса префиксов запрос `"слово"*` собирает в памяти все
+# совпадения сразу и не может остановиться на самых новых.
+PREFIX = '1 2 3 4 5 6 7 8'
+
+
+def recreate_sql(options):
+    """
+    Пересоздаёт индексы с указанными параметрами FTS5.
+
+    Триггеры ссылаются на таблицы по имени, поэтому остаются прежними.
+    """
+    return (
+        'DROP TABLE news_news_fts',
+        f"""
+        CREATE VIRTUAL TABLE news_news_fts USING fts5(
+            title, text,
+            content='news_news', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'{options}
+        )
+        """,
+        'DROP TABLE news_comment_fts',
+        f"""
+        CREATE VIRTUAL TABLE news_comment_fts USING fts5(
+            text,
+            content='news_comment', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'{options}
+        )
+        """,
+        "INSERT INTO news_news_fts(news_news_fts) VALUES ('rebuild')",
+        "INSERT INTO news_comment_fts(news_comment_fts) VALUES ('rebuild')",
+    )
+
+
+FORWARD_SQL = recreate_sql(f", prefix='{PREFIX}'")
+
+BACKWARD_SQL = recreate_sql('') + (
+    "INSERT INTO news_news_fts(news_news_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 1.0)')",
+)
+
+
+def run_on_sqlite(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0007_recentcomment'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_on_sqlite(FORWARD_SQL), run_on_sqlite(BACKWARD_SQL)
+        ),
+    ]
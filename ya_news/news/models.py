@@ -1,22 +1,77 @@
+from contextvars import ContextVar
 from datetime import datetime
 
 from django.conf import settings
 from django.db import models
+from django.db.models.functions import Coalesce, Greatest
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from .pagination import encode_cursor
+
+# Идёт удаление новостей: их комментарии удаляются каскадом, и менять
+# счётчики удаляемых новостей незачем, см. news.signals.
+deleting_news = ContextVar('news_deleting_news', default=False)
+
+
+class NewsQuerySet(models.QuerySet):
+
+    def delete(self):
+        token = deleting_news.set(True)
+        try:
+            return super().delete()
+        finally:
+            deleting_news.reset(token)
+
+    def rebuild_comment_counts(self):
+        """Пересчитывает счётчики комментариев одним UPDATE-запросом."""
+        counts = Comment.objects.filter(
+            news=models.OuterRef('pk')
+        ).order_by().values('news').annotate(
+            count=models.Count('pk')
+        ).values('count')
+        return self.update(
+            comment_count=Coalesce(models.Subquery(counts), 0)
+        )
+
+    def change_comment_count(self, pk, delta):
+        """
+        Атомарно изменяет счётчик комментариев новости.
+
+        Используется F-выражение, поэтому одновременные изменения
+        не теряются. Счётчик не опускается ниже нуля.
+        """
+        return self.filter(pk=pk).update(
+            comment_count=Greatest(models.F('comment_count') + delta, 0)
+        )
 
 
 class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = NewsQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-date',)
+        ordering = ('-date', '-id')
+        indexes = (
+            models.Index(fields=('date', 'id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
     def __str__(self):
         return self.title
 
+    def delete(self, *args, **kwargs):
+        token = deleting_news.set(True)
+        try:
+            return super().delete(*args, **kwargs)
+        finally:
+            deleting_news.reset(token)
+
 
 class Comment(models.Model):
     news = models.ForeignKey(
@@ -29,9 +84,69 @@ class Comment(models.Model):
     )
     text = models.TextField()
     created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created'), name='comment_news_created_idx'
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
+
+    def get_absolute_url(self):
+        """Страница комментариев новости, которая заканчивается этим."""
+        return '{url}?{query}#comment_{pk}'.format(
+            url=reverse('news:detail', kwargs={'pk': self.news_id}),
+            query=urlencode({'until': encode_cursor(self)}),
+            pk=self.pk,
+        )
+
+
+class RecentComment(models.Model):
+    """
+    Копия одного из последних комментариев для ленты обсуждений.
+
+    Заголовок новости и имя автора хранятся в самой записи, поэтому
+    лента читается без соединений с другими таблицами. Число записей
+    ограничено RECENT_COMMENTS_LIMIT, см. news.recent.
+    """
+    comment = models.OneToOneField(
+        Comment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recent',
+    )
+    news = models.ForeignKey(
+        News, on_delete=models.CASCADE, related_name='+'
+    )
+    news_title = models.CharField(max_length=50)
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+'
+    )
+    author_name = models.CharField(max_length=150)
+    text = models.TextField()
+    created = models.DateTimeField()
+
+    class Meta:
+        ordering = ('-pk',)
+
+    def __str__(self):
+        return self.text[:50]
+
+    get_absolute_url = Comment.get_absolute_url
+
+
+class BadWord(models.Model):
+    word = models.CharField('Слово', max_length=100, unique=True)
+
+    class Meta:
+        ordering = ('word',)
+        verbose_name = 'Запрещённое слово'
+        verbose_name_plural = 'Запрещённые слова'
+
+    def __str__(self):
+        return self.word
@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+
+from django.db.models import Q
+from django.http import Http404
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+INVALID_CURSOR = 'Некорректный курсор страницы.'
+# Наибольшее целое, которое SQLite принимает как параметр запроса.
+MAX_PK = 2 ** 63 - 1
+MIN_MICROSECONDS = (
+    datetime.min.replace(tzinfo=timezone.utc) - EPOCH
+) // MICROSECOND
+MAX_MICROSECONDS = (
+    datetime.max.replace(tzinfo=timezone.utc) - EPOCH
+) // MICROSECOND
+
+
+@dataclass
+class KeysetPage:
+    """Страница, полученная курсорной пагинацией по (created, id)."""
+    object_list: list
+    next_cursor: str = None
+    previous_cursor: str = None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def make_cursor(created, pk):
+    """Кодирует пару (created, id) в строку вида `<микросекунды>-<id>`."""
+    return f'{(created - EPOCH) // MICROSECOND}-{pk}'
+
+
+def encode_cursor(obj):
+    return make_cursor(obj.created, obj.pk)
+
+
+def _split_cursor(cursor, low, high):
+    """Пара целых из курсора; первое - в пределах [low, high]."""
+    try:
+        value, pk = (int(part) for part in cursor.split('-'))
+    except ValueError:
+        raise Http404(INVALID_CURSOR)
+    if not low <= value <= high or not 0 <= pk <= MAX_PK:
+        raise Http404(INVALID_CURSOR)
+    return value, pk
+
+
+def decode_cursor(cursor):
+    """Возвращает пару (created, id) из строки курсора."""
+    microseconds, pk = _split_cursor(
+        cursor, MIN_MICROSECONDS, MAX_MICROSECONDS
+    )
+    return EPOCH + timedelta(microseconds=microseconds), pk
+
+
+def make_date_cursor(day, pk):
+    """Кодирует пару (date, id) в строку вида `<номер дня>-<id>`."""
+    return f'{day.toordinal()}-{pk}'
+
+
+def decode_date_cursor(cursor):
+    """Возвращает пару (date, id) из строки курсора."""
+    ordinal, pk = _split_cursor(cursor, 1, date.max.toordinal())
+    return date.fromordinal(ordinal), pk
+
+
+def comes_after(created, pk):
+    """
+    Условие (created, id) > (created, pk).
+
+    Отдельное условие `created >= ...` позволяет базе начать чтение
+    индекса сразу с нужной позиции, а не фильтровать его с начала.
+    """
+    return Q(created__gte=created) & (Q(created__gt=created) | Q(pk__gt=pk))
+
+
+def comes_before(created, pk):
+    """Условие (created, id) < (created, pk)."""
+    return Q(created__lte=created) & (Q(created__lt=created) | Q(pk__lt=pk))
+
+
+def _first(queryset, per_page):
+    """Возвращает первые `per_page` объектов и признак, что есть ещё."""
+    objects = list(queryset[:per_page + 1])
+    return objects[:per_page], len(objects) > per_page
+
+
+def keyset_page(queryset, per_page, after=None, before=None, until=None):
+    """
+    Возвращает страницу объектов, упорядоченных по (created, id).
+
+    `after` и `before` - курсоры соседних страниц (сам курсор в страницу
+    не входит), `until` - курсор объекта, которым страница заканчивается.
+    Вместо OFFSET используется условие на пару (created, id), поэтому
+    дальние страницы стоят столько же, сколько первая.
+    """
+    forward = queryset.order_by('created', 'pk')
+    backward = queryset.order_by('-created', '-pk')
+    if after:
+        objects, has_next = _first(
+            forward.filter(comes_after(*decode_cursor(after))), per_page
+        )
+        has_previous = bool(objects) and backward.filter(
+            comes_before(objects[0].created, objects[0].pk)
+        ).exists()
+    elif before or until:
+        created, pk = decode_cursor(before or until)
+        condition = comes_before(created, pk)
+        if until:
+            condition |= Q(created=created, pk=pk)
+        objects, has_previous = _first(backward.filter(condition), per_page)
+        objects.reverse()
+        has_next = bool(objects) and forward.filter(
+            comes_after(objects[-1].created, objects[-1].pk)
+        ).exists()
+    else:
+        objects, has_next = _first(forward, per_page)
+        has_previous = False
+    return KeysetPage(
+        object_list=objects,
+        next_cursor=encode_cursor(objects[-1]) if has_next else None,
+        previous_cursor=encode_cursor(objects[0]) if has_previous else None,
+    )
@@ -0,0 +1,105 @@
+import re
+import time
+from collections import namedtuple
+
+from django.conf import settings
+
+from .cache import get_version
+
+_MatcherState = namedtuple(
+    '_MatcherState', ('matcher', 'version', 'next_check')
+)
+
+
+def _trie(words):
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return trie
+
+
+def _trie_pattern(node):
+    """
+    Превращает префиксное дерево в регулярное выражение.
+
+    Общие префиксы слов проверяются один раз, поэтому время проверки
+    позиции в тексте зависит от длины слов, а не от их количества.
+    """
+    branches = [
+        re.escape(char) + _trie_pattern(child)
+        for char, child in sorted(node.items()) if char
+    ]
+    if not branches:
+        return ''
+    pattern = (
+        branches[0] if len(branches) == 1
+        else '(?:{})'.format('|'.join(branches))
+    )
+    if '' in node:
+        pattern = f'(?:{pattern})?'
+    return pattern
+
+
+class BadWordsMatcher:
+    """Находит запрещённые слова в тексте за один проход."""
+
+    def __init__(self, words):
+        self.words = frozenset(word.lower() for word in words if word)
+        self.pattern = re.compile(
+            '(?=({}))'.format(_trie_pattern(_trie(self.words)))
+        ) if self.words else None
+
+    def find(self, text):
+        """
+        Возвращает множество запрещённых слов, найденных в тексте.
+
+        Для каждой позиции текста сообщается самое длинное слово,
+        которое с неё начинается.
+        """
+        if self.pattern is None:
+            return set()
+        return {
+            match.group(1) for match in self.pattern.finditer(text.lower())
+        }
+
+
+class RefreshingBadWordsMatcher:
+    """
+    Матчер, который пересобирается при изменении списка слов.
+
+    Собранный матчер хранится в памяти процесса. Версия списка в общем
+    кэше проверяется не чаще раза в `refresh_interval` секунд, а база
+    данных читается только когда версия изменилась. Чтобы изменения
+    видели все процессы, бэкенд кэша должен быть общим для них.
+    """
+
+    def __init__(self, load_words, version_key):
+        self.load_words = load_words
+        self.version_key = version_key
+        self._state = None
+
+    def get(self):
+        """Возвращает актуальный BadWordsMatcher."""
+        now = time.monotonic()
+        state = self._state
+        if state is not None and now < state.next_check:
+            return state.matcher
+        version = get_version(self.version_key)
+        if state is None or state.version != version:
+            matcher = BadWordsMatcher(self.load_words())
+        else:
+            matcher = state.matcher
+        self._state = _MatcherState(
+            matcher, version, now + settings.BAD_WORDS_REFRESH_INTERVAL
+        )
+        return matcher
+
+    def find(self, text):
+        return self.get().find(text)
+
+    def reset(self):
+        """Забывает собранный матчер: следующий вызов соберёт его заново."""
+        self._state = None
@@ -1,17 +1,66 @@
 from datetime import timedelta
+from importlib import import_module, reload
 
 import pytest
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
 from django.test import Client
-from django.urls import reverse
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
 
+from news.forms import bad_words_matcher
 from news.models import Comment, News
 from .utils import today
 
 
 User = get_user_model()
 
+COMMENTS_COUNT = 7
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Кэш не должен переживать тест, в отличие от его базы данных."""
+    cache.clear()
+    bad_words_matcher.reset()
+
+
+@pytest.fixture(scope='session')
+def replica_connection(django_db_setup, django_db_blocker):
+    """
+    Реплика в тестах зеркалит default, но у неё своё соединение, которое
+    не видит незавершённую транзакцию теста. Поэтому реплика работает
+    через соединение default.
+    """
+    with django_db_blocker.unblock():
+        primary = connections['default']
+        primary.ensure_connection()
+        connections['replica'].connection = primary.connection
+
+
+@pytest.fixture
+def replica(settings, replica_connection):
+    """Включает чтение с реплики."""
+    settings.NEWS_REPLICA_DATABASE = 'replica'
+    return 'replica'
+
+
+@pytest.fixture
+def async_views(settings):
+    """Подключает асинхронные версии списка и страницы новости."""
+    def reload_urls():
+        clear_url_caches()
+        reload(import_module('news.urls'))
+        reload(import_module(settings.ROOT_URLCONF))
+
+    settings.NEWS_ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.NEWS_ASYNC_VIEWS = False
+    reload_urls()
+
 
 @pytest.fixture
 def news_object(db):
@@ -55,6 +104,18 @@ def comment(news_object, author):
     )
 
 
+@pytest.fixture
+def comments(news_object, author):
+    """Создаёт комментарии к новости с разным временем создания."""
+    now = timezone.now()
+    for index in range(COMMENTS_COUNT):
+        comment = Comment.objects.create(
+            news=news_object, author=author, text=f'Текст {index}'
+        )
+        comment.created = now + timedelta(hours=index)
+        comment.save()
+
+
 @pytest.fixture
 def news(db):
     """Создает тестовые новости для главной страницы."""
@@ -78,4 +139,6 @@ def urls(comment):
         'login': reverse('users:login'),
         'logout': reverse('users:logout'),
         'signup': reverse('users:signup'),
+        'search': reverse('news:search'),
+        'recent': reverse('news:recent'),
     }
@@ -1,7 +1,24 @@
+import json
+from datetime import timedelta
+from http import HTTPStatus
+
 import pytest
 from django.conf import settings
+from django.db import connection
+from django.db.models.signals import post_init
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 
+from news.cache import bump_home_version, get_home_last_modified
 from news.forms import CommentForm
+from news.models import Comment, News
+from news.search import search
+from news.templating import warm_up_templates
+from yanews import settings_production
+from .utils import async_get
 
 
 pytestmark = pytest.mark.django_db
@@ -44,3 +61,484 @@ def test_authorized_client_has_form(not_author_client, urls):
     response = not_author_client.get(urls['detail'])
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.parametrize('comments_count', [1, 200])
+def test_home_comment_count_single_query(
+    client, urls, news_object, author, comments_count,
+    django_assert_num_queries
+):
+    """
+    Количество комментариев на главной не требует запросов к комментариям.
+
+    Число запросов не зависит от числа комментариев, а сами комментарии
+    не загружаются в память. Last-Modified берётся из кэша.
+    """
+    for index in range(comments_count - 1):
+        Comment.objects.create(
+            news=news_object, author=author, text=f'Текст {index}'
+        )
+    with django_assert_num_queries(1):
+        response = client.get(urls['home'])
+    news_item = response.context['object_list'][0]
+    assert news_item.comment_count == comments_count
+    assert not getattr(news_item, '_prefetched_objects_cache', {})
+    assert f'Комментариев: {comments_count}' in response.content.decode()
+
+
+def test_comments_keyset_pagination(client, urls, comments, settings):
+    """Курсорная пагинация обходит все комментарии без пропусков и повторов."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 3
+    expected_ids = list(
+        Comment.objects.order_by('created', 'id').values_list('id', flat=True)
+    )
+    seen_ids = []
+    url = urls['detail']
+    while url:
+        page = client.get(url).context['comments']
+        assert len(page) <= settings.COMMENTS_COUNT_ON_DETAIL_PAGE
+        seen_ids.extend(comment.id for comment in page)
+        url = page.next_cursor and f"{urls['detail']}?after={page.next_cursor}"
+    assert seen_ids == expected_ids
+    previous = client.get(
+        f"{urls['detail']}?before={page.previous_cursor}"
+    ).context['comments']
+    assert [comment.id for comment in previous] == expected_ids[-5:-2]
+
+
+@pytest.mark.parametrize('cursor', [
+    'nonsense',
+    '99999999999999999999-1',
+    '300000000000000000-1',
+    f'1-{2 ** 63}',
+])
+@pytest.mark.parametrize('param', ['after', 'before', 'until'])
+def test_invalid_comment_cursor(client, urls, news_object, param, cursor):
+    """Курсор вне допустимых пределов даёт 404, а не ошибку сервера."""
+    response = client.get(urls['detail'], {param: cursor})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_deep_comment_page_query_count(client, urls, comments, settings):
+    """Дальняя страница комментариев требует столько же запросов, что и 2-я."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 2
+    page = client.get(urls['detail']).context['comments']
+    queries = []
+    while page.next_cursor:
+        with CaptureQueriesContext(connection) as context:
+            page = client.get(
+                f"{urls['detail']}?after={page.next_cursor}"
+            ).context['comments']
+        queries.append(len(context))
+    assert len(queries) > 2
+    assert len(set(queries)) == 1
+
+
+@pytest.fixture(params=['locmem', 'filebased'])
+def cache_backend(request, settings, tmp_path):
+    """Главная страница кэшируется и в памяти, и в файлах."""
+    if request.param == 'filebased':
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+
+
+def test_home_page_is_cached(
+        client, urls, news, cache_backend, django_assert_num_queries,
+        django_capture_on_commit_callbacks
+):
+    """Повторный показ главной не обращается к базе до изменения данных."""
+    client.get(urls['home'])
+    with django_assert_num_queries(0):
+        response = client.get(urls['home'])
+    assert 'Новость 0' in response.content.decode()
+    with django_capture_on_commit_callbacks(execute=True):
+        News.objects.create(title='Свежая новость', text='Текст')
+    response = client.get(urls['home'])
+    assert 'Свежая новость' in response.content.decode()
+
+
+def test_home_page_conditional_get(
+        client, not_author_client, urls, news, cache_backend,
+        django_assert_num_queries, django_capture_on_commit_callbacks
+):
+    """Главная отдаёт 304 по ETag и Last-Modified, пока данные не менялись."""
+    response = client.get(urls['home'])
+    etag = response['ETag']
+    last_modified = response['Last-Modified']
+    with django_assert_num_queries(0):
+        response = client.get(urls['home'], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(
+        urls['home'], HTTP_IF_MODIFIED_SINCE=last_modified
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = not_author_client.get(urls['home'], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    with django_capture_on_commit_callbacks(execute=True):
+        News.objects.create(title='Свежая новость', text='Текст')
+    response = client.get(urls['home'], HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_home_last_modified_follows_deletes(
+        client, urls, comment, monkeypatch, django_capture_on_commit_callbacks
+):
+    """Удаление комментария сдвигает Last-Modified главной вперёд."""
+    last_modified = client.get(urls['home'])['Last-Modified']
+    later = timezone.now() + timedelta(hours=1)
+    monkeypatch.setattr('news.cache.timezone.now', lambda: later)
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.delete()
+    response = client.get(urls['home'], HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Last-Modified'] == http_date(later.timestamp())
+
+
+def test_home_version_bumps_add_no_cache_keys(settings, tmp_path):
+    """Время изменения хранится в самой версии, а не в отдельных ключах."""
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path),
+    }}
+    bump_home_version()
+    get_home_last_modified()
+    files = len(list(tmp_path.iterdir()))
+    for _ in range(3):
+        bump_home_version()
+        get_home_last_modified()
+    assert len(list(tmp_path.iterdir())) == files
+
+
+def test_comment_html_is_cached_until_change(
+        author_client, not_author_client, urls, comment
+):
+    """Разметка комментария берётся из кэша, пока он не изменён."""
+    author_client.get(urls['detail'])
+    Comment.objects.filter(pk=comment.pk).update(text='Без сохранения')
+    content = not_author_client.get(urls['detail']).content.decode()
+    assert comment.text in content
+    assert 'Редактировать' not in content
+    author_client.post(urls['edit'], data={'text': 'Новый текст'})
+    content = author_client.get(urls['detail']).content.decode()
+    assert 'Новый текст' in content
+    assert 'Редактировать' in content
+
+
+@pytest.mark.parametrize('name', ['home', 'detail'])
+def test_async_views_render_same_pages(
+        request, client, async_client, urls, news, comments, name
+):
+    """Асинхронные версии отдают те же страницы, что и синхронные."""
+    expected = client.get(urls[name])
+    request.getfixturevalue('async_views')
+    response = async_get(async_client, urls[name])
+    assert response.status_code == HTTPStatus.OK
+    assert response.content == expected.content
+    for header in ('ETag', 'Last-Modified'):
+        assert response.get(header) == expected.get(header)
+
+
+def test_async_home_conditional_get(async_client, urls, news, async_views):
+    """Асинхронная главная отвечает 304 по ETag."""
+    etag = async_get(async_client, urls['home'])['ETag']
+    response = async_get(
+        async_client, urls['home'], headers={'If-None-Match': etag}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_async_detail_accepts_comment(
+        author_client, urls, news_object, async_views
+):
+    """Через асинхронную страницу новости можно оставить комментарий."""
+    response = author_client.post(urls['detail'], data={'text': 'Текст'})
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.filter(text='Текст').exists()
+
+
+def test_search_finds_news_and_comments(client, urls, comment):
+    """Поиск находит и новости, и комментарии, подсвечивая совпадения."""
+    news_object = News.objects.create(
+        title='Кошки <захватили> мир', text='Подробности'
+    )
+    Comment.objects.create(
+        news=news_object, author=comment.author, text='Люблю кошек'
+    )
+    response = client.get(urls['search'], {'q': 'кош'})
+    results = response.context['results']
+    assert [result.kind for result in results] == ['news', 'comment']
+    assert {result.news_id for result in results} == {news_object.id}
+    assert results[0].snippet == (
+        '<mark>Кошки</mark> &lt;захватили&gt; мир'
+    )
+    assert results[1].snippet == 'Люблю <mark>кошек</mark>'
+
+
+def test_search_ranks_only_newest_candidates(comment, settings):
+    """Ранжируются только самые новые совпадения каждого индекса."""
+    settings.NEWS_SEARCH_CANDIDATES = 2
+    for text in ('кот кот кот', 'кот', 'кот пёс'):
+        Comment.objects.create(
+            news=comment.news, author=comment.author, text=text
+        )
+    results = search('кот', 0, 2)
+    assert [result.snippet for result in results] == [
+        '<mark>кот</mark>', '<mark>кот</mark> пёс'
+    ]
+    assert search('ПЁС', 0, 10)[0].snippet == 'кот <mark>пёс</mark>'
+
+
+def test_search_pagination(client, urls, news, settings):
+    """Результаты поиска выводятся страницами."""
+    settings.NEWS_SEARCH_RESULTS_ON_PAGE = 4
+    titles = []
+    page = 1
+    while page:
+        response = client.get(urls['search'], {'q': 'новость', 'page': page})
+        titles.extend(result.title for result in response.context['results'])
+        page = response.context['next_page']
+    assert len(titles) == len(set(titles)) == News.objects.filter(
+        title__startswith='Новость'
+    ).count()
+
+
+def test_search_pages_are_capped(client, urls, news, settings):
+    """Номер страницы ограничен, последняя страница не ссылается дальше."""
+    settings.NEWS_SEARCH_RESULTS_ON_PAGE = 1
+    settings.NEWS_SEARCH_MAX_PAGES = 2
+    response = client.get(urls['search'], {'q': 'новость', 'page': 2})
+    assert response.context['next_page'] is None
+    for page in ('0', '3', 'x', str(2 ** 63)):
+        response = client.get(urls['search'], {'q': 'новость', 'page': page})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_recent_comments_pagination(client, urls, comments, settings):
+    """Лента выводит комментарии всех новостей от новых к старым."""
+    settings.RECENT_COMMENTS_ON_PAGE = 3
+    pks, params = [], {}
+    while True:
+        response = client.get(urls['recent'], params)
+        pks.extend(entry.pk for entry in response.context['comments'])
+        if response.context['next_cursor'] is None:
+            break
+        params = {'before': response.context['next_cursor']}
+    assert pks == list(
+        Comment.objects.order_by('-pk').values_list('pk', flat=True)
+    )
+
+
+@pytest.mark.parametrize('before, status', [
+    ('x', HTTPStatus.NOT_FOUND),
+    ('-1', HTTPStatus.NOT_FOUND),
+    (str(2 ** 63), HTTPStatus.NOT_FOUND),
+    ('١٢', HTTPStatus.OK),
+])
+def test_recent_comments_cursor(client, urls, before, status):
+    """Курсор вне пределов ключей SQLite даёт 404, а не ошибку сервера."""
+    response = client.get(urls['recent'], {'before': before})
+    assert response.status_code == status
+
+
+@pytest.mark.parametrize('fmt, content_type', [
+    ('rss', 'application/rss+xml; charset=utf-8'),
+    ('atom', 'application/atom+xml; charset=utf-8'),
+    ('json', 'application/feed+json; charset=utf-8'),
+])
+def test_news_feed_formats(client, news, fmt, content_type):
+    """Лента новостей отдаётся в RSS, Atom и JSON Feed."""
+    response = client.get(reverse('news:feed', args=[fmt]))
+    assert response['Content-Type'] == content_type
+    assert 'Новость 0' in response.content.decode()
+
+
+def test_feed_cached_per_origin(client, news):
+    """Ссылки в закэшированной ленте соответствуют схеме запроса."""
+    url = reverse('news:feed', args=['json'])
+    plain = client.get(url).json()
+    secure = client.get(url, secure=True).json()
+    assert plain['home_page_url'].startswith('http://testserver/')
+    assert secure['home_page_url'].startswith('https://testserver/')
+
+
+@pytest.mark.parametrize('change', ['create_news', 'delete_comment'])
+def test_feed_last_modified_follows_changes(
+        client, comment, change, monkeypatch,
+        django_capture_on_commit_callbacks
+):
+    """
+    Новость за тот же день и удаление комментария сдвигают Last-Modified.
+
+    По датам оставшихся записей ни то, ни другое не видно.
+    """
+    if change == 'create_news':
+        url = reverse('news:feed', args=['rss'])
+    else:
+        url = reverse('news:comments_feed', args=[comment.news_id, 'rss'])
+    last_modified = client.get(url)['Last-Modified']
+    later = timezone.now() + timedelta(hours=1)
+    monkeypatch.setattr('news.cache.timezone.now', lambda: later)
+    with django_capture_on_commit_callbacks(execute=True):
+        if change == 'create_news':
+            News.objects.create(
+                title='Ещё одна', text='Текст', date=comment.news.date
+            )
+        else:
+            comment.delete()
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Last-Modified'] == http_date(later.timestamp())
+
+
+def test_unknown_feed_format(client, news):
+    response = client.get(reverse('news:feed', args=['xml']))
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comments_feed_lists_newest_first(client, news_object, comments):
+    """Лента комментариев новости начинается с самого нового."""
+    response = client.get(
+        reverse('news:comments_feed', args=[news_object.pk, 'json'])
+    )
+    items = json.loads(response.content)['items']
+    assert [item['content_text'] for item in items] == list(
+        Comment.objects.order_by('-created').values_list('text', flat=True)
+    )
+
+
+def test_feed_conditional_get(
+        client, comment, cache_backend, django_assert_num_queries,
+        django_capture_on_commit_callbacks
+):
+    """Опрос ленты без изменений получает 304 без запросов к базе."""
+    url = reverse('news:comments_feed', args=[comment.news_id, 'rss'])
+    response = client.get(url)
+    etag = response['ETag']
+    last_modified = response['Last-Modified']
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(
+            news=comment.news, author=comment.author, text='Свежий'
+        )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Свежий' in response.content.decode()
+
+
+def api_pages(client, url, **params):
+    """Все страницы ответа API, пройденные по курсорам."""
+    rows = []
+    while True:
+        page = client.get(url, params).json()
+        rows.extend(page['results'])
+        if page['next_cursor'] is None:
+            return rows
+        params['cursor'] = page['next_cursor']
+
+
+def test_api_news_cursor_pagination(client, news):
+    """Список новостей проходится курсором по (date, id) без пропусков."""
+    rows = api_pages(
+        client, reverse('news:api_news_list'), limit=4, fields='title'
+    )
+    assert rows == list(News.objects.values('id', 'title'))
+
+
+def test_api_comment_thread_pagination(client, news_object, comments):
+    """Комментарии проходятся курсором по (created, id) от старых."""
+    rows = api_pages(
+        client, reverse('news:api_comments', args=[news_object.pk]),
+        limit=3, fields='author,text'
+    )
+    assert rows == [
+        {'id': comment.pk, 'author': comment.author.username,
+         'text': comment.text}
+        for comment in Comment.objects.order_by('created')
+    ]
+
+
+def test_api_news_detail(client, news_object):
+    response = client.get(
+        reverse('news:api_news_detail', args=[news_object.pk]),
+        {'fields': 'title,comment_count'}
+    )
+    assert response.json() == {
+        'id': news_object.pk, 'title': news_object.title, 'comment_count': 0
+    }
+
+
+@pytest.mark.parametrize('name, params, status', [
+    ('api_news_detail', {}, HTTPStatus.NOT_FOUND),
+    ('api_comments', {}, HTTPStatus.NOT_FOUND),
+    ('api_news_list', {'fields': 'title,secret'}, HTTPStatus.BAD_REQUEST),
+    ('api_news_list', {'limit': '0'}, HTTPStatus.BAD_REQUEST),
+    ('api_news_list', {'limit': '²'}, HTTPStatus.BAD_REQUEST),
+    ('api_news_list', {'cursor': 'nonsense'}, HTTPStatus.BAD_REQUEST),
+    ('api_news_list', {'cursor': '99999999999-1'}, HTTPStatus.BAD_REQUEST),
+    ('api_news_list', {'cursor': f'1-{2 ** 63}'}, HTTPStatus.BAD_REQUEST),
+    ('api_comments', {'cursor': '99999999999999999999-1'},
+     HTTPStatus.BAD_REQUEST),
+    ('api_comments', {'cursor': f'1-{2 ** 63}'}, HTTPStatus.BAD_REQUEST),
+])
+def test_api_errors_are_json(client, name, params, status):
+    args = [] if name == 'api_news_list' else [0]
+    response = client.get(reverse(f'news:{name}', args=args), params)
+    assert response.status_code == status
+    assert 'error' in response.json()
+
+
+def test_api_does_not_create_model_objects(client, comment):
+    """Ответы API собираются из строк выборки, без объектов моделей."""
+    created = []
+
+    def count(sender, **kwargs):
+        created.append(sender)
+
+    urls = (
+        reverse('news:api_news_list'),
+        reverse('news:api_news_detail', args=[comment.news_id]),
+        reverse('news:api_comments', args=[comment.news_id]),
+    )
+    post_init.connect(count)
+    try:
+        for url in urls:
+            assert client.get(url).status_code == HTTPStatus.OK
+    finally:
+        post_init.disconnect(count)
+    assert created == []
+
+
+def test_api_etag(
+        client, comment, django_assert_num_queries,
+        django_capture_on_commit_callbacks
+):
+    """Неизменившийся ответ API отдаётся как 304 без запросов к базе."""
+    url = reverse('news:api_comments', args=[comment.news_id])
+    etag = client.get(url)['ETag']
+    with django_assert_num_queries(0):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    with django_capture_on_commit_callbacks(execute=True):
+        comment.text = 'Правка'
+        comment.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['results'][0]['text'] == 'Правка'
+
+
+def test_templates_warm_up(client, urls, settings):
+    """Прогрев компилирует все шаблоны, запросам остаётся их кэш."""
+    settings.TEMPLATES = settings_production.TEMPLATES
+    templates = list((settings.BASE_DIR / 'templates').rglob('*.html'))
+    count = warm_up_templates()
+    loader = engines['django'].engine.template_loaders[0]
+    assert count == len(templates)
+    assert len(loader.get_template_cache) == count
+    client.get(urls['detail'])
+    assert len(loader.get_template_cache) == count
@@ -0,0 +1,31 @@
+import pytest
+from django.conf import settings
+from django.db import connection
+
+from news.db import pragma_statements
+
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='PRAGMA есть только в SQLite'
+    ),
+]
+
+
+def test_connection_uses_sqlite_pragmas():
+    """Новое соединение настраивается значениями из SQLITE_PRAGMAS."""
+    with connection.cursor() as cursor:
+        for name in ('busy_timeout', 'cache_size', 'synchronous'):
+            cursor.execute(f'PRAGMA {name}')
+            value = cursor.fetchone()[0]
+            expected = settings.SQLITE_PRAGMAS[name]
+            if name == 'synchronous':
+                expected = {'NORMAL': 1}[expected]
+            assert value == expected, name
+
+
+def test_unknown_pragma_is_rejected():
+    """Неизвестные PRAGMA в настройках не выполняются."""
+    with pytest.raises(ValueError):
+        pragma_statements({'writable_schema': 'ON'})
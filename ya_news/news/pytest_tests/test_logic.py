@@ -1,9 +1,34 @@
+import json
+import logging
+import sqlite3
+import time
+from contextlib import closing
 from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
 
 import pytest
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections
+from django.db.models.deletion import Collector
+from django.http import HttpResponse
+from django.template.response import SimpleTemplateResponse
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
 
-from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.cache import get_home_version, get_news_feed_version
+from news.db import copy_sqlite_database
+from news.forms import BAD_WORDS, WARNING, CommentForm, bad_words_matcher
+from news.loading import READ_CHUNK_SIZE, iter_items
+from news.middleware import QueryTimingMiddleware
+from news.models import (
+    BadWord, Comment, News, RecentComment, deleting_news
+)
+from news.pagination import encode_cursor
+from news.routers import PRIMARY_UNTIL_SESSION_KEY, replica_alias
+from news.profanity import BadWordsMatcher
+from news.search import search
 
 
 pytestmark = pytest.mark.django_db
@@ -17,9 +42,11 @@ def test_user_can_create_comment(author_client, urls, news_object, author):
     comment_count = Comment.objects.count()
     assert comment_count == 1
     assert response.status_code == HTTPStatus.FOUND
-    detail_url = (urls['detail'] + '#comments')
-    assert response.url == detail_url
     comment = Comment.objects.get()
+    detail_url = '{url}?until={cursor}#comment_{pk}'.format(
+        url=urls['detail'], cursor=encode_cursor(comment), pk=comment.pk
+    )
+    assert response.url == detail_url
     assert comment.text == form_data['text']
     assert comment.news == news_object
     assert comment.author == author
@@ -83,3 +110,460 @@ def test_user_cant_edit_comment_of_another_user(
     assert comment_from_db.text == comment.text
     assert comment_from_db.author == comment.author
     assert comment_from_db.news == comment.news
+
+
+def test_comment_count_follows_create_and_delete(
+        author_client, urls, news_object
+):
+    """Счётчик комментариев меняется при создании и удалении комментария."""
+    news_object.refresh_from_db()
+    assert news_object.comment_count == 1
+    author_client.post(urls['detail'], data={'text': 'Ещё комментарий'})
+    news_object.refresh_from_db()
+    assert news_object.comment_count == 2
+    author_client.post(urls['delete'])
+    news_object.refresh_from_db()
+    assert news_object.comment_count == 1
+
+
+def test_rebuild_comment_counts(news_object, author):
+    """Команда rebuild_comment_counts восстанавливает счётчики."""
+    Comment.objects.bulk_create(
+        Comment(news=news_object, author=author, text=f'Текст {index}')
+        for index in range(5)
+    )
+    news_object.refresh_from_db()
+    assert news_object.comment_count == 0
+    call_command('rebuild_comment_counts', stdout=StringIO())
+    news_object.refresh_from_db()
+    assert news_object.comment_count == 5
+
+
+def test_comment_count_ignores_stale_news(news_object, author):
+    """
+    Счётчик увеличивается в базе, а не по значению из объекта новости.
+
+    Между чтением новости и сохранением комментария счётчик меняет другой
+    запрос: `news.comment_count += 1; news.save()` потерял бы его изменения.
+    """
+    News.objects.filter(pk=news_object.pk).update(comment_count=5)
+    Comment.objects.create(news=news_object, author=author, text='Текст')
+    assert news_object.comment_count == 0
+    news_object.refresh_from_db()
+    assert news_object.comment_count == 6
+
+
+def test_new_comment_redirects_to_its_page(
+        author_client, urls, comments, settings
+):
+    """После отправки комментария пользователь попадает на его страницу."""
+    settings.COMMENTS_COUNT_ON_DETAIL_PAGE = 2
+    response = author_client.post(
+        urls['detail'], data={'text': 'Новый комментарий'}, follow=True
+    )
+    new_comment = Comment.objects.latest('pk')
+    assert new_comment in response.context['comments']
+
+
+@pytest.mark.parametrize(
+    'method, page, data, expected_queries',
+    [
+        # Сессия, пользователь, комментарий вместе с новостью.
+        ('get', 'edit', None, 3),
+        ('get', 'delete', None, 3),
+        # Плюс UPDATE комментария и его копии в ленте обсуждений.
+        ('post', 'edit', {'text': 'Новый текст'}, 5),
+        # Плюс DELETE копии в ленте и комментария, UPDATE счётчика новости.
+        # Ленту дополняют после фиксации транзакции.
+        ('post', 'delete', None, 6),
+        # Сессия, пользователь, новость, SAVEPOINT, INSERT, UPDATE счётчика,
+        # INSERT в ленту и обрезка ленты, RELEASE SAVEPOINT.
+        ('post', 'detail', {'text': 'Новый комментарий'}, 9),
+    ],
+)
+def test_comment_write_query_budget(
+        author_client, urls, method, page, data, expected_queries,
+        django_assert_num_queries
+):
+    """Запись комментариев не запрашивает уже загруженные объекты повторно."""
+    # Список запрещённых слов процесс загружает один раз, а не на запрос.
+    bad_words_matcher.get()
+    with django_assert_num_queries(expected_queries):
+        response = getattr(author_client, method)(urls[page], data=data)
+    assert response.status_code in (HTTPStatus.OK, HTTPStatus.FOUND)
+
+
+def test_bad_words_matcher_reports_found_words():
+    """Проверка находит все запрещённые слова за один проход по тексту."""
+    matcher = BadWordsMatcher(BAD_WORDS + ('плохое слово', 'а.б'))
+    text = f'{BAD_WORDS[1].upper()}, плохое слово и {BAD_WORDS[0]}. аxб'
+    assert matcher.find(text) == {BAD_WORDS[0], BAD_WORDS[1], 'плохое слово'}
+    assert matcher.find('Хороший текст') == set()
+    assert BadWordsMatcher(()).find(text) == set()
+
+
+def test_bad_words_from_database(
+        author_client, urls, settings, django_capture_on_commit_callbacks
+):
+    """Слово, добавленное в базу, запрещается без перезапуска процесса."""
+    settings.BAD_WORDS_REFRESH_INTERVAL = 0
+    form_data = {'text': 'Текст со словом бяка'}
+    assert CommentForm(data=form_data).is_valid()
+    with django_capture_on_commit_callbacks(execute=True):
+        BadWord.objects.create(word='бяка')
+    response = author_client.post(urls['detail'], data=form_data)
+    assert response.context['form'].errors['text'] == [WARNING]
+
+
+def test_bad_words_check_does_not_query_database(
+        settings, django_assert_num_queries
+):
+    """Пока список слов не менялся, проверка не обращается к базе."""
+    settings.BAD_WORDS_REFRESH_INTERVAL = 0
+    CommentForm(data={'text': 'Текст'}).is_valid()
+    with django_assert_num_queries(0):
+        for _ in range(3):
+            assert CommentForm(data={'text': 'Текст'}).is_valid()
+
+
+def test_search_index_follows_comment_changes(author_client, urls, comment):
+    """Поисковый индекс обновляется при изменении и удалении комментария."""
+    author_client.post(urls['edit'], data={'text': 'Про кошек'})
+    assert [result.kind for result in search('кошек', 0, 10)] == ['comment']
+    assert search(comment.text, 0, 10) == []
+    author_client.post(urls['delete'])
+    assert search('кошек', 0, 10) == []
+
+
+def test_recent_comments_follow_comment_changes(author_client, urls, comment):
+    """Лента обновляется при создании, изменении и удалении комментария."""
+    author_client.post(urls['detail'], data={'text': 'Новый'})
+    author_client.post(urls['edit'], data={'text': 'Правка'})
+    assert list(RecentComment.objects.values_list('text', flat=True)) == [
+        'Новый', 'Правка'
+    ]
+    author_client.post(urls['delete'])
+    assert list(RecentComment.objects.values_list('text', flat=True)) == [
+        'Новый'
+    ]
+    comment.news.title = 'Новый заголовок'
+    comment.news.save()
+    assert RecentComment.objects.get().news_title == 'Новый заголовок'
+
+
+def test_recent_comments_are_capped(
+        news_object, author, settings, django_capture_on_commit_callbacks
+):
+    """Лента ограничена RECENT_COMMENTS_LIMIT, удалённые записи замещаются."""
+    settings.RECENT_COMMENTS_LIMIT = 3
+    created = [
+        Comment.objects.create(
+            news=news_object, author=author, text=f'Текст {index}'
+        )
+        for index in range(5)
+    ]
+    recent_pks = list(RecentComment.objects.values_list('pk', flat=True))
+    assert recent_pks == [comment.pk for comment in created[:1:-1]]
+    with django_capture_on_commit_callbacks(execute=True):
+        created[-1].delete()
+    recent_pks = list(RecentComment.objects.values_list('pk', flat=True))
+    assert recent_pks == [comment.pk for comment in created[-2:0:-1]]
+    call_command('rebuild_recent_comments', stdout=StringIO())
+    assert RecentComment.objects.count() == 3
+
+
+def test_news_delete_skips_comment_count_updates(
+        news_object, comments, author
+):
+    """Каскадное удаление новости не обновляет её счётчик комментариев."""
+    other = News.objects.create(title='Другая', text='Текст')
+    Comment.objects.create(news=other, author=author, text='Текст')
+    with CaptureQueriesContext(connection) as context:
+        news_object.delete()
+    assert not [
+        query for query in context
+        if query['sql'].startswith('UPDATE "news_news"')
+    ]
+    other.comment_set.get().delete()
+    other.refresh_from_db()
+    assert other.comment_count == 0
+
+
+def test_news_queryset_delete_skips_comment_count_updates(
+        news_object, comments
+):
+    """Удаление новостей запросом тоже не обновляет их счётчики."""
+    with CaptureQueriesContext(connection) as context:
+        News.objects.filter(pk=news_object.pk).delete()
+    assert not [
+        query for query in context
+        if query['sql'].startswith('UPDATE "news_news"')
+    ]
+    assert deleting_news.get() is False
+
+
+def test_failed_news_delete_resets_mark(news_object, comments, monkeypatch):
+    """После неудачного удаления новости счётчики снова обновляются."""
+    def fail(self):
+        raise DatabaseError
+
+    with monkeypatch.context() as patch:
+        patch.setattr(Collector, 'delete', fail)
+        with pytest.raises(DatabaseError):
+            news_object.delete()
+    assert deleting_news.get() is False
+    count = news_object.comment_set.count()
+    news_object.comment_set.first().delete()
+    news_object.refresh_from_db()
+    assert news_object.comment_count == count - 1
+
+
+def test_recent_comments_refilled_once_per_delete(
+        news_object, author, settings, django_capture_on_commit_callbacks
+):
+    """Каскадное удаление многих комментариев дополняет ленту один раз."""
+    settings.RECENT_COMMENTS_LIMIT = 3
+    other = News.objects.create(title='Другая', text='Текст')
+    older = [
+        Comment.objects.create(news=other, author=author, text='Старый')
+        for _ in range(3)
+    ]
+    for index in range(5):
+        Comment.objects.create(
+            news=news_object, author=author, text=f'Текст {index}'
+        )
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        news_object.delete()
+    assert [
+        callback.__name__ for callback in callbacks
+    ].count('refill_recent_comments') == 1
+    assert list(
+        RecentComment.objects.values_list('pk', flat=True)
+    ) == [comment.pk for comment in reversed(older)]
+
+
+def test_rebuild_news_search(comment):
+    """Команда rebuild_news_search восстанавливает индексы."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO news_comment_fts(news_comment_fts) "
+            "VALUES ('delete-all')"
+        )
+    assert search(comment.text, 0, 10) == []
+    call_command('rebuild_news_search', stdout=StringIO())
+    assert len(search(comment.text, 0, 10)) == 1
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, READ_CHUNK_SIZE])
+@pytest.mark.parametrize('as_array', [True, False])
+def test_iter_items_reads_stream_in_chunks(chunk_size, as_array):
+    """Лента разбирается по кускам независимо от их размера."""
+    items = [
+        {'title': 'Скобка ] и запятая ,', 'text': 'Кавычка \" и \\n'},
+        {'title': 'Вторая', 'text': '{"вложенный": [1, 2]}'},
+    ]
+    lines = [json.dumps(item, ensure_ascii=False) for item in items]
+    content = (
+        '[\n' + ',\n'.join(lines) + '\n]' if as_array else '\n'.join(lines)
+    )
+    assert list(iter_items(StringIO(content), chunk_size)) == items
+
+
+def test_iter_items_limits_item_size(monkeypatch):
+    """Незакрытый объект не читается до конца потока."""
+    monkeypatch.setattr('news.loading.MAX_ITEM_SIZE', 30)
+    stream = StringIO('{"title": "Первая"}\n{"title": "' + 'x' * 100)
+    items = iter_items(stream, chunk_size=4)
+    assert next(items) == {'title': 'Первая'}
+    with pytest.raises(ValueError, match='с символа 20 '):
+        next(items)
+    assert stream.tell() < 100
+
+
+def test_iter_items_reports_error_offset():
+    with pytest.raises(ValueError, match='в символе 25'):
+        list(iter_items(StringIO('[{"title": "Первая"},\n  {oops}]')))
+
+
+def test_load_news_bumps_feed_version(
+        tmp_path, django_capture_on_commit_callbacks
+):
+    """bulk_create не отправляет сигналы, версию ленты меняет загрузка."""
+    version = get_news_feed_version()
+    feed = tmp_path / 'feed.ndjson'
+    feed.write_text(json.dumps(
+        {'title': 'Загруженная', 'text': 'Текст', 'date': '2024-01-01'},
+        ensure_ascii=False,
+    ), encoding='utf-8')
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command('load_news', str(feed), stdout=StringIO())
+    assert get_news_feed_version() != version
+
+
+def test_load_news_is_idempotent(tmp_path):
+    """Повторная загрузка ленты обновляет новости, а не дублирует их."""
+    fixture = Path(__file__).parent.parent / 'fixtures' / 'news.json'
+    items = json.loads(fixture.read_text(encoding='utf-8'))
+    call_command('load_news', str(fixture), stdout=StringIO())
+    assert News.objects.count() == len(items)
+    call_command('load_news', str(fixture), stdout=StringIO())
+    assert News.objects.count() == len(items)
+    changed = dict(items[0]['fields'], text='Новый текст')
+    feed = tmp_path / 'feed.ndjson'
+    feed.write_text(json.dumps(changed, ensure_ascii=False), encoding='utf-8')
+    output = StringIO()
+    call_command('load_news', str(feed), batch_size=1, stdout=output)
+    assert 'обновлено: 1' in output.getvalue()
+    assert News.objects.get(title=changed['title']).text == 'Новый текст'
+
+
+def test_generate_news(django_capture_on_commit_callbacks):
+    """Генератор создаёт связанные данные, пользователи могут войти."""
+    versions = get_home_version(), get_news_feed_version()
+    with django_capture_on_commit_callbacks(execute=True):
+        call_command(
+            'generate_news', users=5, news=20, comments=200,
+            stdout=StringIO()
+        )
+    assert get_home_version() != versions[0]
+    assert get_news_feed_version() != versions[1]
+    assert News.objects.count() == 20
+    assert Comment.objects.count() == 200
+    assert sum(
+        News.objects.values_list('comment_count', flat=True)
+    ) == 200
+    assert Client().login(username='synthetic-0', password='password')
+
+
+def news_queries(alias):
+    """Запросы к таблицам новостей, выполненные через псевдоним базы."""
+    return CaptureQueriesContext(connections[alias])
+
+
+def reads_news(captured):
+    return any('"news_' in query['sql'] for query in captured)
+
+
+@pytest.mark.parametrize('name', ['home', 'detail'])
+def test_shipped_settings_read_from_primary(client, urls, news_object, name):
+    """Без настроенной реплики страницы читаются с основной базы."""
+    assert replica_alias() is None
+    with news_queries('default') as primary:
+        response = client.get(urls[name])
+    assert response.status_code == HTTPStatus.OK
+    assert reads_news(primary)
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+@pytest.mark.parametrize('name', ['home', 'detail'])
+def test_read_views_use_replica(client, urls, news_object, replica, name):
+    """Список и страница новости читаются с реплики."""
+    with news_queries('default') as primary, news_queries(replica) as copy:
+        response = client.get(urls[name])
+    assert response.status_code == HTTPStatus.OK
+    assert reads_news(copy)
+    assert not reads_news(primary)
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_comment_author_reads_own_writes(
+        author_client, urls, news_object, replica
+):
+    """После комментария сессия читает с основной базы, пока не истечёт."""
+    author_client.post(urls['detail'], data={'text': 'Текст'})
+    with news_queries('default') as primary, news_queries(replica) as copy:
+        response = author_client.get(urls['detail'])
+    assert 'Текст' in response.content.decode()
+    assert reads_news(primary)
+    assert not reads_news(copy)
+    session = author_client.session
+    session[PRIMARY_UNTIL_SESSION_KEY] = 0
+    session.save()
+    with news_queries(replica) as copy:
+        author_client.get(urls['detail'])
+    assert reads_news(copy)
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_home_reads_primary_after_change(
+        client, urls, replica, django_capture_on_commit_callbacks
+):
+    """Пока реплика может отставать, главная строится по основной базе."""
+    with django_capture_on_commit_callbacks(execute=True):
+        News.objects.create(title='Заголовок', text='Текст')
+    with news_queries(replica) as copy:
+        client.get(urls['home'])
+    assert not reads_news(copy)
+    cache.clear()
+    with news_queries(replica) as copy:
+        client.get(urls['home'])
+    assert reads_news(copy)
+
+
+def test_replica_copy_lags_until_next_copy(tmp_path):
+    """Копия базы видит только данные на момент копирования."""
+    source = tmp_path / 'primary.sqlite3'
+    target = tmp_path / 'replica.sqlite3'
+    with closing(sqlite3.connect(source, isolation_level=None)) as primary:
+        primary.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        primary.execute('INSERT INTO item DEFAULT VALUES')
+        copy_sqlite_database(source, target)
+        primary.execute('INSERT INTO item DEFAULT VALUES')
+
+    def replica_rows():
+        with closing(sqlite3.connect(target)) as replica:
+            return replica.execute('SELECT COUNT(*) FROM item').fetchone()[0]
+
+    assert replica_rows() == 1
+    copy_sqlite_database(source, target)
+    assert replica_rows() == 2
+
+
+def test_timing_header_and_log(client, urls, caplog):
+    """Ответ получает Server-Timing, а в лог пишется строка JSON."""
+    with caplog.at_level(logging.INFO, logger='news.middleware'):
+        response = client.get(urls['detail'])
+    assert 'db;dur=' in response['Server-Timing']
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['view'] == 'news:detail'
+    assert record['status'] == HTTPStatus.OK
+    assert record['duplicates'] == []
+
+
+@pytest.mark.django_db(databases=['default', 'replica'])
+def test_timing_counts_render_on_replica(
+        client, urls, news_object, replica, caplog, monkeypatch
+):
+    """Рендеринг внутри представления при чтении с реплики тоже замеряется."""
+    render = SimpleTemplateResponse.render
+
+    def slow_render(response):
+        time.sleep(0.01)
+        return render(response)
+
+    monkeypatch.setattr(SimpleTemplateResponse, 'render', slow_render)
+    with caplog.at_level(logging.INFO, logger='news.middleware'):
+        client.get(urls['detail'])
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['template_ms'] >= 10
+
+
+def test_timing_flags_repeated_queries(rf, news, caplog):
+    """Поштучная загрузка строк отмечается как повтор запроса."""
+    def view(request):
+        for news_object in News.objects.all():
+            Comment.objects.filter(news=news_object).count()
+        return HttpResponse()
+
+    with caplog.at_level(logging.INFO, logger='news.middleware'):
+        QueryTimingMiddleware(view)(rf.get('/'))
+    record = caplog.records[-1]
+    duplicates = json.loads(record.getMessage())['duplicates']
+    assert record.levelno == logging.WARNING
+    assert [item['count'] for item in duplicates] == [News.objects.count()]
+
+
+def test_timing_is_sampled(client, urls, settings):
+    """Вне выборки ответ не замеряется."""
+    settings.PERFORMANCE_SAMPLE_RATE = 0
+    assert 'Server-Timing' not in client.get(urls['home'])
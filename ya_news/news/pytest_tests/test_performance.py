@@ -0,0 +1,130 @@
+import os
+import time
+from collections import namedtuple
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from news import urls as news_urls
+from news.models import Comment, News
+from news.recent import rebuild_recent_comments
+from yanews import urls as project_urls
+
+
+User = get_user_model()
+
+COMMENTS_PER_STORY = 10_000
+STORIES = 11
+
+# Время ответа зависит от машины, поэтому сверяется с бюджетом, только
+# когда задана переменная окружения CHECK_LATENCY. Число запросов к базе
+# проверяется всегда.
+CHECK_LATENCY = bool(os.environ.get('CHECK_LATENCY'))
+
+Budget = namedtuple(
+    'Budget', ('route', 'method', 'user', 'queries', 'ms', 'data'),
+    defaults=(None,)
+)
+
+# Наибольшее число запросов к базе и время ответа для каждого маршрута
+# при холодном кэше и новости с COMMENTS_PER_STORY комментариями.
+BUDGETS = (
+    Budget('news:home', 'get', 'anonymous', 1, 150),
+    Budget('news:detail', 'get', 'anonymous', 2, 150),
+    Budget('news:detail', 'get', 'author', 4, 150),
+    Budget('news:detail', 'post', 'author', 10, 150, {'text': 'Новый'}),
+    Budget('news:edit', 'get', 'author', 3, 100),
+    Budget('news:edit', 'post', 'author', 6, 100, {'text': 'Правка'}),
+    Budget('news:delete', 'get', 'author', 3, 100),
+    Budget('news:delete', 'post', 'author', 8, 100),
+    Budget('news:search', 'get', 'anonymous', 1, 150, {'q': 'комментарий'}),
+    Budget('news:recent', 'get', 'anonymous', 1, 100),
+    Budget('news:feed', 'get', 'anonymous', 1, 100),
+    Budget('news:comments_feed', 'get', 'anonymous', 2, 100),
+    Budget('news:api_news_list', 'get', 'anonymous', 1, 100),
+    Budget('news:api_news_detail', 'get', 'anonymous', 1, 100),
+    Budget('news:api_comments', 'get', 'anonymous', 1, 100),
+    Budget('users:login', 'get', 'anonymous', 0, 100),
+    Budget('users:logout', 'get', 'author', 4, 100),
+    Budget('users:signup', 'get', 'anonymous', 0, 100),
+)
+
+
+@pytest.fixture(scope='module')
+def volume(django_db_setup, django_db_blocker):
+    """
+    Новости и комментарии на весь модуль.
+
+    Данные создаются во внешней транзакции, которая откатывается после
+    тестов модуля; транзакции самих тестов вложены в неё.
+    """
+    with django_db_blocker.unblock(), transaction.atomic():
+        author = User.objects.create(username='Автор')
+        News.objects.bulk_create(
+            News(title=f'Новость {index}', text='Текст')
+            for index in range(STORIES)
+        )
+        story = News.objects.first()
+        Comment.objects.bulk_create(
+            (
+                Comment(
+                    news=story, author=author, text=f'Комментарий {index}'
+                )
+                for index in range(COMMENTS_PER_STORY)
+            ),
+            batch_size=5000,
+        )
+        News.objects.rebuild_comment_counts()
+        rebuild_recent_comments()
+        comment = story.comment_set.first()
+        yield {
+            'author': author,
+            'args': {
+                'news:detail': [story.pk],
+                'news:feed': ['rss'],
+                'news:comments_feed': [story.pk, 'atom'],
+                'news:api_news_detail': [story.pk],
+                'news:api_comments': [story.pk],
+                'news:edit': [comment.pk],
+                'news:delete': [comment.pk],
+            },
+        }
+        transaction.set_rollback(True)
+
+
+def named_routes():
+    """Имена всех маршрутов новостей и пользователей."""
+    return {
+        f'news:{pattern.name}' for pattern in news_urls.urlpatterns
+    } | {
+        f'users:{pattern.name}' for pattern in project_urls.auth_urls[0]
+    }
+
+
+def test_every_route_has_budget():
+    """Новый маршрут не останется без бюджета."""
+    assert {budget.route for budget in BUDGETS} == named_routes()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'budget', BUDGETS,
+    ids=lambda budget: f'{budget.method}-{budget.route}-{budget.user}'
+)
+def test_route_budget(volume, budget, django_assert_max_num_queries):
+    """Маршрут укладывается в число запросов и время ответа."""
+    client = Client()
+    if budget.user == 'author':
+        client.force_login(volume['author'])
+    url = reverse(budget.route, args=volume['args'].get(budget.route))
+    request = getattr(client, budget.method)
+    with django_assert_max_num_queries(budget.queries):
+        started = time.perf_counter()
+        response = request(url, data=budget.data)
+        elapsed = (time.perf_counter() - started) * 1000
+    assert response.status_code < 400
+    if CHECK_LATENCY:
+        assert elapsed < budget.ms
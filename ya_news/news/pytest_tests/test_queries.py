@@ -0,0 +1,63 @@
+import re
+
+import pytest
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from news.models import Comment, News
+from news.pagination import comes_after, comes_before
+
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='План запроса в формате SQLite'
+    ),
+]
+
+FULL_SCAN = re.compile(r'\bSCAN \w+$', re.MULTILINE)
+
+
+def assert_uses_index(queryset):
+    """Запрос читает таблицы по индексу и не сортирует во временном дереве."""
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), plan
+    assert 'TEMP B-TREE' not in plan, plan
+
+
+def test_home_page_uses_date_index():
+    """Главная страница читает новости по индексу (date, id)."""
+    queryset = News.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+    assert_uses_index(queryset)
+    assert 'news_date_id_idx' in queryset.explain()
+
+
+@pytest.mark.parametrize(
+    'condition, ordering',
+    [
+        (None, ('created', 'pk')),
+        (comes_after, ('created', 'pk')),
+        (comes_before, ('-created', '-pk')),
+    ],
+)
+def test_comment_page_uses_news_created_index(
+        news_object, condition, ordering
+):
+    """Страница комментариев читается по индексу (news, created)."""
+    queryset = news_object.comment_set.select_related('author')
+    if condition:
+        queryset = queryset.filter(condition(timezone.now(), 1))
+    queryset = queryset.order_by(*ordering)[
+        :settings.COMMENTS_COUNT_ON_DETAIL_PAGE + 1
+    ]
+    assert_uses_index(queryset)
+    assert 'comment_news_created_idx' in queryset.explain()
+
+
+def test_author_comments_use_index(author, comment):
+    """Комментарии автора (CommentBase.get_queryset) ищутся по индексу."""
+    assert_uses_index(Comment.objects.filter(author=author).order_by())
+    assert_uses_index(
+        Comment.objects.filter(author=author, pk=comment.pk).order_by()
+    )
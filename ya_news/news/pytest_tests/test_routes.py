@@ -14,6 +14,8 @@ pytestmark = pytest.mark.django_db
         ('client', 'login', HTTPStatus.OK),
         ('client', 'logout', HTTPStatus.OK),
         ('client', 'signup', HTTPStatus.OK),
+        ('client', 'search', HTTPStatus.OK),
+        ('client', 'recent', HTTPStatus.OK),
         ('author_client', 'edit', HTTPStatus.OK),
         ('author_client', 'delete', HTTPStatus.OK),
         ('not_author_client', 'edit', HTTPStatus.NOT_FOUND),
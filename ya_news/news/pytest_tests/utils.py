@@ -1,5 +1,20 @@
 from datetime import datetime
 
+from asgiref.sync import async_to_sync
+
 
 def today():
     return datetime.today()
+
+
+def async_get(async_client, url, headers=None):
+    """
+    Синхронно выполняет GET-запрос асинхронного клиента.
+
+    AsyncClient в Django 3.2 принимает заголовки по их именам,
+    например If-None-Match, а не в виде HTTP_*.
+    """
+    async def get():
+        return await async_client.get(url, **(headers or {}))
+
+    return async_to_sync(get)()
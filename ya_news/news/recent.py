@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Subquery
+
+from .models import Comment, RecentComment
+
+
+def make_entry(comment):
+    """Запись ленты для комментария с уже загруженными новостью и автором."""
+    return RecentComment(
+        comment=comment,
+        news_id=comment.news_id,
+        news_title=comment.news.title,
+        author_id=comment.author_id,
+        author_name=comment.author.get_username(),
+        text=comment.text,
+        created=comment.created,
+    )
+
+
+def add_recent_comment(comment):
+    """
+    Добавляет новый комментарий в ленту и удаляет вытесненные им записи.
+
+    Новый комментарий всегда самый свежий, поэтому обрезка - одно
+    условие на первичный ключ.
+    """
+    make_entry(comment).save(force_insert=True)
+    RecentComment.objects.filter(pk__lte=Subquery(
+        RecentComment.objects.values('pk')[
+            settings.RECENT_COMMENTS_LIMIT:settings.RECENT_COMMENTS_LIMIT + 1
+        ]
+    )).delete()
+
+
+def update_recent_comment(comment):
+    RecentComment.objects.filter(pk=comment.pk).update(text=comment.text)
+
+
+def rename_news(news):
+    RecentComment.objects.filter(news_id=news.pk).update(
+        news_title=news.title
+    )
+
+
+def rename_author(user):
+    RecentComment.objects.filter(author_id=user.pk).update(
+        author_name=user.get_username()
+    )
+
+
+def refill_recent_comments():
+    """
+    Дополняет ленту более старыми комментариями после удалений.
+
+    Запись удалённого комментария удаляется каскадно. Если лента
+    заполнена, хватает одного запроса.
+    """
+    stats = RecentComment.objects.aggregate(
+        count=Count('pk'), oldest=Min('pk')
+    )
+    missing = settings.RECENT_COMMENTS_LIMIT - stats['count']
+    if missing <= 0:
+        return
+    comments = Comment.objects.select_related('news', 'author').order_by('-pk')
+    if stats['oldest'] is not None:
+        comments = comments.filter(pk__lt=stats['oldest'])
+    RecentComment.objects.bulk_create(
+        make_entry(comment) for comment in comments[:missing]
+    )
+
+
+@transaction.atomic
+def rebuild_recent_comments():
+    """Заполняет ленту заново, например после bulk_create комментариев."""
+    RecentComment.objects.all().delete()
+    refill_recent_comments()
+    return RecentComment.objects.count()
+
+
+def recent_comments_page(per_page, before=None):
+    """
+    Страница ленты от новых к старым и курсор следующей страницы.
+
+    Курсор - id последнего комментария страницы. Чтение не зависит от
+    общего числа комментариев: лента ограничена RECENT_COMMENTS_LIMIT.
+    """
+    entries = RecentComment.objects.all()
+    if before is not None:
+        entries = entries.filter(pk__lt=before)
+    entries = list(entries[:per_page + 1])
+    next_cursor = entries[per_page - 1].pk if len(entries) > per_page else None
+    return entries[:per_page], next_cursor
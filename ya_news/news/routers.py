@@ -0,0 +1,79 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+PRIMARY_UNTIL_SESSION_KEY = 'news_primary_until'
+
+_replica_reads = ContextVar('news_replica_reads', default=False)
+
+
+def replica_alias():
+    """Псевдоним реплики или None, если реплика не настроена."""
+    alias = getattr(settings, 'NEWS_REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+
+@contextmanager
+def replica_reads():
+    """Внутри блока чтение моделей новостей идёт с реплики."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def stick_to_primary(request):
+    """
+    Привязывает сессию к основной базе на время отставания реплики.
+
+    Вызывается после записи, чтобы автор сразу видел свои изменения.
+    """
+    if replica_alias():
+        request.session[PRIMARY_UNTIL_SESSION_KEY] = (
+            time.time() + settings.NEWS_REPLICA_LAG
+        )
+
+
+def is_stuck_to_primary(request):
+    until = request.session.get(PRIMARY_UNTIL_SESSION_KEY)
+    return until is not None and until > time.time()
+
+
+class ReplicaRouter:
+    """
+    Направляет чтение моделей новостей на реплику.
+
+    Только внутри replica_reads(): остальные запросы, в том числе все
+    записи, идут в основную базу.
+    """
+
+    app_label = 'news'
+
+    def db_for_read(self, model, **hints):
+        alias = replica_alias()
+        if (
+            alias and _replica_reads.get()
+            and model._meta.app_label == self.app_label
+        ):
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        """Реплика содержит те же данные, что и основная база."""
+        databases = {DEFAULT_DB_ALIAS, replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Схема реплики копируется с основной базы вместе с данными."""
+        if db == replica_alias():
+            return False
+        return None
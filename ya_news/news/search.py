@@ -0,0 +1,206 @@
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+from itertools import repeat
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import News
+
+TOKEN = re.compile(r'\w+')
+COMBINING = re.compile('[\u0300-\u036f]')
+SNIPPET_TOKENS = 16
+# Веса столбцов и параметры bm25: заголовок новости весит как десять
+# слов текста.
+WEIGHTS = {'news': (10.0, 1.0), 'comment': (1.0,)}
+BM25_K1, BM25_B = 1.2, 0.75
+# Из каждого индекса берутся самые новые совпадения: FTS5 отдаёт их по
+# убыванию rowid, не обходя все совпадения частого слова. Встроенный
+# bm25 так не умеет — он считает, в скольких строках встречается каждое
+# слово, — поэтому кандидаты ранжируются в Python.
+CANDIDATES_SQL = """
+    SELECT * FROM (
+        SELECT 'news', news.id, news.id, news.title, news.text
+        FROM news_news_fts
+        JOIN news_news AS news ON news.id = news_news_fts.rowid
+        WHERE news_news_fts MATCH %s
+        ORDER BY news_news_fts.rowid DESC LIMIT %s
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'comment', comment.id, news.id, news.title, comment.text
+        FROM news_comment_fts
+        JOIN news_comment AS comment ON comment.id = news_comment_fts.rowid
+        JOIN news_news AS news ON news.id = comment.news_id
+        WHERE news_comment_fts MATCH %s
+        ORDER BY news_comment_fts.rowid DESC LIMIT %s
+    )
+"""
+
+SearchResult = namedtuple(
+    'SearchResult', ('kind', 'news_id', 'title', 'snippet')
+)
+
+
+def fold(text):
+    """Строчные буквы без диакритических знаков, как у токенизатора FTS5."""
+    return COMBINING.sub('', unicodedata.normalize('NFKD', text.lower()))
+
+
+def search_terms(text):
+    return TOKEN.findall(text.lower())
+
+
+def fts_query(terms):
+    """
+    Строит запрос FTS5 из слов пользовательской строки.
+
+    Каждое слово ищется по префиксу, синтаксис FTS5 из строки не
+    интерпретируется.
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def columns(kind, title, content):
+    """Проиндексированные тексты результата в порядке столбцов индекса."""
+    return (title, content) if kind == 'news' else (content,)
+
+
+def count_terms(text, prefixes):
+    """Число слов текста и число слов, начинающихся с каждого префикса."""
+    tokens = TOKEN.findall(fold(text))
+    return len(tokens), [
+        sum(map(str.startswith, tokens, repeat(prefix)))
+        for prefix in prefixes
+    ]
+
+
+def bm25(count, relative_length):
+    """Вклад слова, найденного `count` раз, без множителя IDF."""
+    return count * (BM25_K1 + 1) / (
+        count + BM25_K1 * (1 - BM25_B + BM25_B * relative_length)
+    )
+
+
+def rank(rows, terms):
+    """
+    Упорядочивает кандидатов по bm25 без множителя IDF.
+
+    Кандидаты одного индекса содержат все слова запроса, поэтому IDF
+    почти не различает их, а его точный расчёт обходил бы все совпадения.
+    Длина текста сравнивается со средней длиной у кандидатов.
+    """
+    prefixes = tuple(fold(term) for term in terms)
+    counted = [
+        [count_terms(text, prefixes) for text in columns(kind, title, text)]
+        for kind, _, _, title, text in rows
+    ]
+    lengths = defaultdict(list)
+    for (kind, *_), row_counts in zip(rows, counted):
+        for column, (length, _) in enumerate(row_counts):
+            lengths[kind, column].append(length)
+    average = {
+        key: max(sum(values) / len(values), 1)
+        for key, values in lengths.items()
+    }
+    scores = {}
+    for (kind, pk, *_), row_counts in zip(rows, counted):
+        scores[kind, pk] = sum(
+            weight * sum(
+                bm25(count, length / average[kind, column])
+                for count in counts
+            )
+            for column, (weight, (length, counts)) in enumerate(
+                zip(WEIGHTS[kind], row_counts)
+            )
+        )
+    return sorted(rows, key=lambda row: (
+        -scores[row[0], row[1]], row[0], row[1]
+    ))
+
+
+def make_snippet(texts, terms):
+    """
+    Фрагмент первого из `texts`, где есть совпадение, с подсветкой.
+
+    Как snippet() FTS5: до SNIPPET_TOKENS слов, начиная незадолго до
+    первого совпадения, найденные по префиксу слова обёрнуты в <mark>.
+    """
+    prefixes = tuple(fold(term) for term in terms)
+    for text in texts:
+        tokens = list(TOKEN.finditer(text))
+        found = [
+            index for index, token in enumerate(tokens)
+            if fold(token.group()).startswith(prefixes)
+        ]
+        if found:
+            break
+    if not tokens:
+        return ''
+    first = max(0, min(
+        (found[0] if found else 0) - SNIPPET_TOKENS // 4,
+        len(tokens) - SNIPPET_TOKENS,
+    ))
+    last = min(first + SNIPPET_TOKENS, len(tokens))
+    found = set(found)
+    parts = ['…'] if first else []
+    position = tokens[first].start()
+    for index in range(first, last):
+        token = tokens[index]
+        parts.append(escape(text[position:token.start()]))
+        word = escape(token.group())
+        parts.append(f'<mark>{word}</mark>' if index in found else word)
+        position = token.end()
+    if last < len(tokens):
+        parts.append('…')
+    else:
+        parts.append(escape(text[position:]))
+    return mark_safe(''.join(parts))
+
+
+def search(text, offset, limit):
+    """
+    Ищет новости и комментарии, упорядочивая их по релевантности.
+
+    Возвращает не больше `limit` результатов, пропустив первые `offset`.
+    Ранжируются NEWS_SEARCH_CANDIDATES самых новых совпадений каждого
+    индекса, поэтому время поиска не растёт с частотой слова.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    if connection.vendor != 'sqlite':
+        return [
+            SearchResult('news', news.id, news.title, '')
+            for news in News.objects.filter(
+                Q(title__icontains=text) | Q(text__icontains=text)
+            ).only('id', 'title')[offset:offset + limit]
+        ]
+    query = fts_query(terms)
+    candidates = max(settings.NEWS_SEARCH_CANDIDATES, offset + limit)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            CANDIDATES_SQL, [query, candidates, query, candidates]
+        )
+        rows = cursor.fetchall()
+    return [
+        SearchResult(kind, news_id, title, make_snippet(
+            columns(kind, title, content), terms
+        ))
+        for kind, _, news_id, title, content in rank(rows, terms)[
+            offset:offset + limit
+        ]
+    ]
+
+
+def rebuild_index():
+    """Перестраивает поисковые индексы новостей и комментариев."""
+    with connection.cursor() as cursor:
+        for table in ('news_news_fts', 'news_comment_fts'):
+            cursor.execute(
+                f"INSERT INTO {table}({table}) VALUES ('rebuild')"
+            )
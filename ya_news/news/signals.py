@@ -0,0 +1,123 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import (
+    BAD_WORDS_VERSION_KEY, bump_comments_version, bump_home_version,
+    bump_news_feeds, bump_version
+)
+from .models import BadWord, Comment, News, deleting_news
+from .recent import (
+    add_recent_comment, refill_recent_comments, rename_author, rename_news,
+    update_recent_comment
+)
+
+
+@receiver(post_save, sender=Comment)
+def increase_comment_count(sender, instance, created, raw=False, **kwargs):
+    """Увеличивает счётчик комментариев новости при создании комментария."""
+    if created and not raw:
+        News.objects.change_comment_count(instance.news_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    """
+    Уменьшает счётчик комментариев новости при удалении комментария.
+
+    Срабатывает и при удалении из админки. При каскадном удалении
+    новости счётчик не меняется: он удаляется вместе с ней, а UPDATE
+    на каждый комментарий был бы лишним.
+    """
+    if not deleting_news.get():
+        News.objects.change_comment_count(instance.news_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+def update_recent_comments(sender, instance, created, raw=False, **kwargs):
+    """Добавляет новый комментарий в ленту или обновляет его текст в ней."""
+    if raw:
+        return
+    if created:
+        add_recent_comment(instance)
+    else:
+        update_recent_comment(instance)
+
+
+def on_commit_once(func):
+    """
+    Как transaction.on_commit, но функция выполняется раз за транзакцию.
+
+    Нужна обработчикам, которые срабатывают на каждый объект при
+    каскадном удалении, а работу делают одну на всё удаление.
+    """
+    connection = transaction.get_connection()
+    if connection.in_atomic_block and any(
+        callback[1] is func for callback in connection.run_on_commit
+    ):
+        return
+    transaction.on_commit(func)
+
+
+@receiver(post_delete, sender=Comment)
+def fill_recent_comments(sender, **kwargs):
+    """
+    Запись удаляется каскадно, освободившееся место занимают старые.
+
+    Лента дополняется один раз после всего удаления. Если удалённых
+    комментариев в ленте не было, она осталась полной и дополнение
+    ограничивается одним запросом.
+    """
+    on_commit_once(refill_recent_comments)
+
+
+@receiver(post_save, sender=News)
+def rename_news_in_recent_comments(
+        sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    if created or raw:
+        return
+    if update_fields is None or 'title' in update_fields:
+        rename_news(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def rename_author_in_recent_comments(
+        sender, instance, created, raw=False, update_fields=None, **kwargs
+):
+    """Вход сохраняет только last_login, такие сохранения пропускаются."""
+    if created or raw:
+        return
+    if update_fields is None or 'username' in update_fields:
+        rename_author(instance)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_home_page(sender, **kwargs):
+    """Сбрасывает кэш главной страницы после фиксации транзакции."""
+    transaction.on_commit(bump_home_version)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+def invalidate_news_feeds(sender, instance, **kwargs):
+    """Заголовок новости есть и в ленте новостей, и в ленте комментариев."""
+    transaction.on_commit(lambda: bump_news_feeds(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    news_id = instance.news_id
+    transaction.on_commit(lambda: bump_comments_version(news_id))
+
+
+@receiver(post_save, sender=BadWord)
+@receiver(post_delete, sender=BadWord)
+def invalidate_bad_words(sender, **kwargs):
+    """Сообщает процессам, что список запрещённых слов изменился."""
+    transaction.on_commit(lambda: bump_version(BAD_WORDS_VERSION_KEY))
@@ -1,16 +1,39 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import api, async_views, feeds, views
 
 app_name = 'news'
 
+if settings.NEWS_ASYNC_VIEWS:
+    home_view = async_views.news_list
+    detail_view = async_views.news_detail
+else:
+    home_view = views.NewsList.as_view()
+    detail_view = views.NewsDetailView.as_view()
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', home_view, name='home'),
+    path('news/<int:pk>/', detail_view, name='detail'),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
         name='delete'
     ),
     path('edit_comment/<int:pk>/', views.CommentUpdate.as_view(), name='edit'),
+    path('search/', views.NewsSearch.as_view(), name='search'),
+    path('comments/', views.RecentComments.as_view(), name='recent'),
+    path('feeds/news.<str:fmt>', feeds.news_feed, name='feed'),
+    path(
+        'feeds/news/<int:pk>/comments.<str:fmt>',
+        feeds.comments_feed,
+        name='comments_feed'
+    ),
+    path('api/news/', api.news_list, name='api_news_list'),
+    path('api/news/<int:pk>/', api.news_detail, name='api_news_detail'),
+    path(
+        'api/news/<int:pk>/comments/',
+        api.comment_thread,
+        name='api_comments'
+    ),
 ]
@@ -1,39 +1,110 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .cache import (
+    get_home_version, home_changed_recently, home_etag, home_last_modified,
+    render_comments
+)
 from .forms import CommentForm
+from .middleware import render_timed
 from .models import Comment, News
+from .pagination import INVALID_CURSOR, MAX_PK, keyset_page
+from .recent import recent_comments_page
+from .routers import (
+    is_stuck_to_primary, replica_alias, replica_reads, stick_to_primary
+)
+from .search import search
+
+
+class ReplicaReadMixin:
+    """
+    Читает новости и комментарии с реплики.
+
+    Сессия, только что записавшая комментарий, читает с основной базы,
+    пока реплика может отставать.
+    """
+
+    def use_replica(self):
+        return (
+            replica_alias() is not None
+            and not is_stuck_to_primary(self.request)
+        )
 
-
-class NewsList(generic.ListView):
-    """Список новостей."""
+    def dispatch(self, request, *args, **kwargs):
+        if not self.use_replica():
+            return super().dispatch(request, *args, **kwargs)
+        with replica_reads():
+            response = super().dispatch(request, *args, **kwargs)
+            # Шаблон выполняет ленивые запросы, поэтому рендерим здесь же.
+            if hasattr(response, 'render'):
+                render_timed(request, response)
+        return response
+
+
+@method_decorator(
+    condition(etag_func=home_etag, last_modified_func=home_last_modified),
+    name='get'
+)
+class NewsList(ReplicaReadMixin, generic.ListView):
+    """
+    Список новостей.
+
+    Список в шаблоне кэшируется по версии главной страницы, которая
+    меняется при записи новостей и комментариев. Повторные запросы
+    с совпадающим ETag получают ответ 304.
+    """
     model = News
     template_name = 'news/home.html'
 
+    def use_replica(self):
+        return super().use_replica() and not home_changed_recently()
+
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта. Количество
+        комментариев хранится в самой новости, поэтому таблица
+        комментариев не запрашивается.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.model.objects.all()[:settings.NEWS_COUNT_ON_HOME_PAGE]
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['home_version'] = get_home_version()
+        context['cache_timeout'] = settings.NEWS_HOME_CACHE_TIMEOUT
+        return context
+
+
+class CommentPageMixin:
+    """Добавляет в контекст одну страницу комментариев к новости."""
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = keyset_page(
+            self.object.comment_set.select_related('author'),
+            settings.COMMENTS_COUNT_ON_DETAIL_PAGE,
+            after=self.request.GET.get('after'),
+            before=self.request.GET.get('before'),
+            until=self.request.GET.get('until'),
+        )
+        render_comments(context['comments'])
+        return context
 
 
-class NewsDetail(generic.DetailView):
+class NewsDetail(ReplicaReadMixin, CommentPageMixin, generic.DetailView):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
-        return obj
+        return get_object_or_404(self.model, pk=self.kwargs['pk'])
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -44,6 +115,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        CommentPageMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -55,16 +127,19 @@ class NewsComment(
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
+    @transaction.atomic
     def form_valid(self, form):
         comment = form.save(commit=False)
         comment.news = self.object
         comment.author = self.request.user
         comment.save()
+        self.comment = comment
+        stick_to_primary(self.request)
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        """Ведёт на страницу комментариев, которая заканчивается новым."""
+        return self.comment.get_absolute_url()
 
 
 class NewsDetailView(generic.View):
@@ -83,14 +158,16 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
+        """Использует уже загруженный комментарий, не запрашивая новость."""
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -98,7 +175,79 @@ class CommentUpdate(CommentBase, generic.UpdateView):
     template_name = 'news/edit.html'
     form_class = CommentForm
 
+    def form_valid(self, form):
+        stick_to_primary(self.request)
+        return super().form_valid(form)
+
 
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    def delete(self, request, *args, **kwargs):
+        stick_to_primary(request)
+        return super().delete(request, *args, **kwargs)
+
+
+class NewsSearch(generic.TemplateView):
+    """Полнотекстовый поиск по новостям и комментариям."""
+    template_name = 'news/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        page = self.get_page()
+        per_page = settings.NEWS_SEARCH_RESULTS_ON_PAGE
+        results = search(
+            query, (page - 1) * per_page, per_page + 1
+        ) if query else []
+        context.update(
+            query=query,
+            results=results[:per_page],
+            previous_page=page - 1 if page > 1 else None,
+            next_page=(
+                page + 1 if len(results) > per_page
+                and page < settings.NEWS_SEARCH_MAX_PAGES else None
+            ),
+        )
+        return context
+
+    def get_page(self):
+        """Номер страницы от 1 до NEWS_SEARCH_MAX_PAGES."""
+        try:
+            page = int(self.request.GET.get('page', 1))
+        except ValueError:
+            raise Http404('Некорректный номер страницы.')
+        if not 1 <= page <= settings.NEWS_SEARCH_MAX_PAGES:
+            raise Http404('Некорректный номер страницы.')
+        return page
+
+
+class RecentComments(generic.TemplateView):
+    """
+    Лента последних комментариев ко всем новостям.
+
+    Читается из ограниченной таблицы RecentComment, которая обновляется
+    при записи комментариев, а не собирается из всех комментариев.
+    """
+    template_name = 'news/recent.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'], context['next_cursor'] = recent_comments_page(
+            settings.RECENT_COMMENTS_ON_PAGE, before=self.get_before()
+        )
+        return context
+
+    def get_before(self):
+        """Курсор `before` - id комментария в пределах ключей SQLite."""
+        before = self.request.GET.get('before')
+        if not before:
+            return None
+        try:
+            before = int(before)
+        except ValueError:
+            raise Http404(INVALID_CURSOR)
+        if not 0 <= before <= MAX_PK:
+            raise Http404(INVALID_CURSOR)
+        return before
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 from django.urls import reverse_lazy
@@ -21,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.middleware.QueryTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,6 +50,9 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать шаблоны при запуске, см. settings_production.
+TEMPLATES_WARM_UP = False
+
 WSGI_APPLICATION = 'yanews.wsgi.application'
 
 
@@ -55,6 +60,47 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
+    },
+    # Локально реплика - копия основной базы, которую обновляет
+    # команда replicate_news; читается, только если задана переменная
+    # NEWS_REPLICA_DATABASE. В тестах реплика указывает на default.
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['news.routers.ReplicaRouter']
+
+# Чтение списка и страницы новости идёт с этой базы. Реплика включается
+# переменной окружения, когда её уже заполнила команда replicate_news:
+# схему реплики migrate не создаёт.
+NEWS_REPLICA_DATABASE = os.environ.get('NEWS_REPLICA_DATABASE') or None
+
+# Наибольшее ожидаемое отставание реплики, в секундах.
+NEWS_REPLICA_LAG = 10
+
+# Асинхронные версии списка и страницы новости для работы под ASGI.
+NEWS_ASYNC_VIEWS = False
+
+# Применяются к каждому новому соединению, см. db.apply_sqlite_pragmas.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # Разметка комментариев кэшируется поштучно: 300 записей
+        # по умолчанию не хватает даже на одну длинную ветку.
+        'OPTIONS': {'MAX_ENTRIES': 20_000},
     }
 }
 
@@ -80,3 +126,53 @@ LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+NEWS_HOME_CACHE_TIMEOUT = 60 * 60
+
+BAD_WORDS_REFRESH_INTERVAL = 30
+
+NEWS_SEARCH_RESULTS_ON_PAGE = 20
+# Каждая страница поиска заново отбирает все предыдущие результаты,
+# поэтому их число ограничено.
+NEWS_SEARCH_MAX_PAGES = 50
+# Сколько самых новых совпадений из каждого индекса ранжируется.
+NEWS_SEARCH_CANDIDATES = 200
+
+COMMENTS_COUNT_ON_DETAIL_PAGE = 50
+
+# Лента обсуждений хранит столько последних комментариев, см. news.recent.
+RECENT_COMMENTS_LIMIT = 200
+
+RECENT_COMMENTS_ON_PAGE = 20
+
+# Разметка комментария кэшируется до его изменения, но не дольше суток:
+# так в ней со временем обновляется, например, имя автора.
+COMMENTS_CACHE_TIMEOUT = 24 * 60 * 60
+
+FEED_ITEMS_COUNT = 20
+
+API_PAGE_SIZE = 20
+
+API_MAX_PAGE_SIZE = 100
+
+# Ленты хранятся в кэше до изменения новостей или комментариев, но не
+# дольше суток: в ленте комментариев есть имена авторов.
+FEEDS_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Доля ответов, для которых собираются число запросов и время,
+# см. news.middleware.QueryTimingMiddleware.
+PERFORMANCE_SAMPLE_RATE = 1
+
+# Столько одинаковых запросов за ответ считаются признаком N+1.
+PERFORMANCE_DUPLICATE_QUERIES = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'news.middleware': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}
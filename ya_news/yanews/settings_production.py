@@ -0,0 +1,22 @@
+from copy import deepcopy
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES
+
+DEBUG = False
+
+# Шаблоны разбираются один раз за время жизни процесса.
+TEMPLATES = deepcopy(TEMPLATES)
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Компилировать шаблоны при запуске, а не на первых запросах.
+TEMPLATES_WARM_UP = True
+
+# Замер нагрузки только для каждого сотого ответа.
+PERFORMANCE_SAMPLE_RATE = 0.01
@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class NotesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notes'
+
+    def ready(self):
+        from .db import apply_sqlite_pragmas
+        connection_created.connect(
+            apply_sqlite_pragmas, dispatch_uid='notes_sqlite_pragmas'
+        )
+        if settings.TEMPLATES_WARM_UP:
+            from .templating import warm_up_templates
+            warm_up_templates()
@@ -0,0 +1,50 @@
+"""
+Настройка соединений SQLite.
+
+Копия модуля в соседнем проекте (news/db.py и notes/db.py)
+должна оставаться такой же.
+"""
+import sqlite3
+from contextlib import closing
+
+from django.conf import settings
+
+ALLOWED_PRAGMAS = frozenset((
+    'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'busy_timeout',
+    'temp_store', 'foreign_keys',
+))
+
+
+def pragma_statements(pragmas):
+    """Возвращает команды PRAGMA, отказывая в неизвестных именах."""
+    unknown = set(pragmas) - ALLOWED_PRAGMAS
+    if unknown:
+        raise ValueError(f'Неизвестные PRAGMA: {", ".join(sorted(unknown))}')
+    return [f'PRAGMA {name} = {value}' for name, value in pragmas.items()]
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Настраивает каждое новое соединение с SQLite.
+
+    Значения берутся из настройки SQLITE_PRAGMAS. Обработчик подключается
+    к сигналу connection_created в конфигурации приложения.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    statements = pragma_statements(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def copy_sqlite_database(source, target):
+    """
+    Копирует базу SQLite целиком, не останавливая запись в источник.
+
+    Используется для локальной реплики: копия отстаёт от источника на
+    время между вызовами.
+    """
+    with closing(sqlite3.connect(source)) as origin:
+        with closing(sqlite3.connect(target)) as replica:
+            origin.backup(replica)
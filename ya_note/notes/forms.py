@@ -1,5 +1,3 @@
-from pytils.translit import slugify
-
 from django import forms
 from django.core.exceptions import ValidationError
 
@@ -16,14 +14,32 @@ class NoteForm(forms.ModelForm):
         fields = ('title', 'text', 'slug')
 
     def clean_slug(self):
-        """Обрабатывает случай, если slug не уникален."""
-        cleaned_data = super().clean()
-        slug = cleaned_data.get('slug')
-        if not slug:
-            title = cleaned_data.get('title')
-            slug = slugify(title)[:100]
-        if Note.objects.filter(
+        """
+        Обрабатывает случай, если указанный slug не уникален.
+
+        Пустой slug не проверяется: свободный slug подберёт Note.save.
+        """
+        slug = self.cleaned_data.get('slug')
+        if slug and Note.objects.filter(
                 slug=slug
         ).exclude(id=self.instance.pk).exists():
             raise ValidationError(slug + WARNING)
         return slug
+
+    def validate_unique(self):
+        """Уникальность slug уже проверена в clean_slug."""
+        exclude = self._get_validation_exclusions()
+        exclude.append('slug')
+        try:
+            self.instance.validate_unique(exclude=exclude)
+        except ValidationError as error:
+            self._update_errors(error)
+
+
+class NotesImportForm(forms.Form):
+    """Форма загрузки файла с заметками в формате NDJSON."""
+    file = forms.FileField(
+        label='Файл NDJSON',
+        help_text='Одна заметка на строку: {"title": ..., "text": ..., '
+                  '"slug": ...}'
+    )
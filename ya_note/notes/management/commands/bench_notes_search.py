@@ -0,0 +1,74 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notes.models import Note
+from notes.search import search_notes
+
+User = get_user_model()
+VOCABULARY_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет время полнотекстового поиска по заметкам. Данные '
+        'создаются во временной транзакции и откатываются после замера.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        generator = random.Random(options['seed'])
+        vocabulary = [f'слово{index}' for index in range(VOCABULARY_SIZE)]
+        with transaction.atomic():
+            User.objects.bulk_create(
+                User(username=f'bench-search-{index}')
+                for index in range(options['users'])
+            )
+            users = list(
+                User.objects.filter(username__startswith='bench-search-')
+            )
+            started = time.perf_counter()
+            self.create_notes(generator, vocabulary, users, options)
+            self.stdout.write(
+                f'Создано заметок: {options["notes"]} за '
+                f'{time.perf_counter() - started:.1f} с'
+            )
+            timings = []
+            for _ in range(options['queries']):
+                user = generator.choice(users)
+                query = ' '.join(generator.sample(vocabulary, 2))
+                started = time.perf_counter()
+                search_notes(user, query, 20)
+                timings.append((time.perf_counter() - started) * 1000)
+            transaction.set_rollback(True)
+        timings.sort()
+        self.stdout.write(
+            f'Поиск, мс: p50={statistics.median(timings):.2f} '
+            f'p95={timings[int(len(timings) * 0.95) - 1]:.2f} '
+            f'max={timings[-1]:.2f}'
+        )
+
+    def create_notes(self, generator, vocabulary, users, options):
+        batch_size = options['batch_size']
+        for start in range(0, options['notes'], batch_size):
+            Note.objects.bulk_create(
+                Note(
+                    title=' '.join(generator.choices(vocabulary, k=4)),
+                    text=' '.join(generator.choices(vocabulary, k=60)),
+                    slug=f'bench-search-{index}',
+                    author=generator.choice(users),
+                )
+                for index in range(
+                    start, min(start + batch_size, options['notes'])
+                )
+            )
@@ -0,0 +1,82 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from notes.models import Note
+from notes.templating import warm_up_templates
+from yanote import settings_production
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время ответа страниц с загрузчиками шаблонов из '
+        'настроек и с кэширующим загрузчиком из settings_production. '
+        'Данные создаются во временной транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--notes', type=int, default=50)
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('Загрузчики из настроек', settings.TEMPLATES, False),
+            ('Кэширующий загрузчик', settings_production.TEMPLATES, True),
+        )
+        with transaction.atomic():
+            client, pages = self.create_pages(options)
+            for name, templates, warm_up in profiles:
+                with override_settings(TEMPLATES=templates):
+                    started = time.perf_counter()
+                    if warm_up:
+                        warm_up_templates()
+                    self.stdout.write(
+                        f'{name}, подготовка '
+                        f'{(time.perf_counter() - started) * 1000:.1f} мс:'
+                    )
+                    self.measure(client, pages, options['requests'])
+            transaction.set_rollback(True)
+
+    def create_pages(self, options):
+        author = User.objects.create(username='bench-templates')
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text='Текст',
+                slug=f'bench-templates-{index}',
+                author=author,
+            )
+            for index in range(options['notes'])
+        )
+        client = Client()
+        client.force_login(author)
+        slug = 'bench-templates-0'
+        return client, {
+            'home': reverse('notes:home'),
+            'list': reverse('notes:list'),
+            'detail': reverse('notes:detail', args=[slug]),
+            'add': reverse('notes:add'),
+            'edit': reverse('notes:edit', args=[slug]),
+            'search': reverse('notes:search') + '?q=Заметка',
+        }
+
+    def measure(self, client, pages, requests):
+        for name, url in pages.items():
+            timings = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'  {name}: первый запрос {timings[0]:.2f} мс, '
+                f'медиана {statistics.median(timings[1:]):.2f} мс'
+            )
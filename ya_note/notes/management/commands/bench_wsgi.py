@@ -0,0 +1,54 @@
+from urllib.parse import urlencode
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.urls import reverse
+
+from notes.benchmarking import BenchCommand, make_environ, session_cookie
+from notes.models import Note
+
+User = get_user_model()
+
+SEARCH_QUERY = 'купить'
+
+
+class Command(BenchCommand):
+    help = (
+        'Нагружает WSGI-приложение внутри процесса из пула потоков и '
+        'выводит JSON с запросами в секунду, p50/p95/p99 и выделенной '
+        'памятью по каждому адресу. Работает с данными текущей базы, '
+        'их создаёт команда generate_notes.'
+    )
+
+    def data(self):
+        return {
+            'users': User.objects.count(),
+            'notes': Note.objects.count(),
+        }
+
+    def endpoints(self):
+        authors = User.objects.annotate(
+            notes=Count('note')
+        ).filter(notes__gt=0).order_by('-notes')
+        prolific = authors.first()
+        if prolific is None:
+            raise CommandError('Нет заметок: запустите generate_notes.')
+        typical = authors[authors.count() // 2]
+        cookie = session_cookie(prolific)
+        note = Note.objects.filter(author=prolific).last()
+        return {
+            'home': make_environ(reverse('notes:home')),
+            'list_prolific': make_environ(reverse('notes:list'), cookie),
+            'list_typical': make_environ(
+                reverse('notes:list'), session_cookie(typical)
+            ),
+            'detail': make_environ(
+                reverse('notes:detail', args=(note.slug,)), cookie
+            ),
+            'search': make_environ(
+                f'{reverse("notes:search")}?{urlencode({"q": SEARCH_QUERY})}',
+                cookie,
+            ),
+            'export': make_environ(reverse('notes:export'), cookie),
+        }
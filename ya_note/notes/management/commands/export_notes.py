@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.transfer import export_notes
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Выгружает заметки пользователя в формате NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            '--chunk-size', type=int,
+            default=settings.NOTES_EXPORT_CHUNK_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        for line in export_notes(author, options['chunk_size']):
+            self.stdout.write(line, ending='')
@@ -0,0 +1,114 @@
+import random
+import time
+from itertools import accumulate
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pytils.translit import slugify
+
+from notes.models import Note, allocate_slugs
+
+User = get_user_model()
+
+WORDS = (
+    'купить', 'молоко', 'хлеб', 'позвонить', 'маме', 'врачу', 'встреча',
+    'проект', 'отчёт', 'план', 'неделя', 'идея', 'книга', 'фильм',
+    'поездка', 'билеты', 'отпуск', 'ремонт', 'счёт', 'оплатить', 'письмо',
+    'ответить', 'список', 'задача', 'работа', 'учёба', 'экзамен', 'курс',
+    'рецепт', 'подарок', 'день', 'рождения', 'спорт', 'зал', 'бег',
+)
+# Чем меньше, тем сильнее заметки сосредоточены у немногих пользователей.
+POPULARITY_SHAPE = 1.2
+
+
+def words(generator, mean):
+    """Текст с логнормальным числом слов: много коротких, мало длинных."""
+    count = max(1, round(generator.lognormvariate(0, 0.8) * mean))
+    return ' '.join(generator.choices(WORDS, k=count)).capitalize()
+
+
+def created_ids(model, objects):
+    """
+    Ключи строк, только что созданных bulk_create.
+
+    SQLite в Django 3.2 не возвращает ключи из bulk_create, поэтому
+    берутся последние ключи таблицы: команда не рассчитана на
+    одновременную запись в те же таблицы.
+    """
+    if objects and objects[0].pk is not None:
+        return [instance.pk for instance in objects]
+    return list(model.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    )[:len(objects)])
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт синтетических пользователей и заметки для нагрузочных '
+        'замеров. Заметки распределены между авторами по закону Парето, '
+        'slug подбираются так же, как при импорте.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--notes', type=int, default=50_000)
+        parser.add_argument('--prefix', default='synthetic')
+        parser.add_argument(
+            '--password', default='password',
+            help='Пароль всех созданных пользователей.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        generator = random.Random(options['seed'])
+        started = time.perf_counter()
+        with transaction.atomic():
+            user_ids = self.create_users(options)
+            self.create_notes(generator, user_ids, options)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пользователей: {len(user_ids)}, '
+            f'заметок: {options["notes"] if user_ids else 0}, '
+            f'{time.perf_counter() - started:.1f} с'
+        ))
+
+    def create_users(self, options):
+        prefix = options['prefix']
+        first = User.objects.filter(username__startswith=prefix).count()
+        # Хэш считается один раз: он самая дорогая часть создания.
+        password = make_password(options['password'])
+        return created_ids(User, User.objects.bulk_create(
+            (
+                User(username=f'{prefix}-{index}', password=password)
+                for index in range(first, first + options['users'])
+            ),
+            batch_size=options['batch_size'],
+        ))
+
+    def create_notes(self, generator, user_ids, options):
+        if not user_ids:
+            return
+        author_weights = list(accumulate(
+            generator.paretovariate(POPULARITY_SHAPE) for _ in user_ids
+        ))
+        titles = [
+            words(generator, 3)[:Note._meta.get_field('title').max_length]
+            for _ in range(options['notes'])
+        ]
+        slugs = allocate_slugs([slugify(title) for title in titles])
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=title,
+                    text=words(generator, 40),
+                    slug=slug,
+                    author_id=generator.choices(
+                        user_ids, cum_weights=author_weights
+                    )[0],
+                )
+                for title, slug in zip(titles, slugs)
+            ),
+            batch_size=options['batch_size'],
+        )
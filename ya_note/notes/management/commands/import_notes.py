@@ -0,0 +1,47 @@
+import sys
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.transfer import import_notes
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Импортирует заметки пользователя из файла NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument(
+            'path', help='Путь к файлу NDJSON, "-" - стандартный ввод.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.NOTES_IMPORT_BATCH_SIZE,
+        )
+
+    def handle(self, *args, **options):
+        try:
+            author = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('Пользователь не найден.')
+        started = time.perf_counter()
+        try:
+            if options['path'] == '-':
+                count = import_notes(
+                    author, sys.stdin, options['batch_size']
+                )
+            else:
+                with open(options['path'], encoding='utf-8') as lines:
+                    count = import_notes(
+                        author, lines, options['batch_size']
+                    )
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано заметок: {count} за '
+            f'{time.perf_counter() - started:.1f} с'
+        ))
@@ -0,0 +1,139 @@
+"""
+Замер запросов к базе и времени ответа.
+
+Копия модуля в соседнем проекте (news/middleware.py и notes/middleware.py)
+должна оставаться такой же.
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+SQL_IN_LOG_LENGTH = 200
+
+
+@dataclass
+class RequestTiming:
+    """Запросы к базе и время, потраченное на ответ, в секундах."""
+    queries: Counter = field(default_factory=Counter)
+    sql: float = 0
+    template: float = 0
+    total: float = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        """Обёртка выполнения запроса, см. connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql += time.perf_counter() - started
+            self.queries[sql] += 1
+
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+
+    def duplicates(self):
+        """
+        Запросы, выполненные не меньше PERFORMANCE_DUPLICATE_QUERIES раз.
+
+        Параметры в тексте запроса не подставлены, поэтому поштучная
+        загрузка строк (N+1) выглядит как повтор одного запроса.
+        """
+        return {
+            sql: count for sql, count in self.queries.items()
+            if count >= settings.PERFORMANCE_DUPLICATE_QUERIES
+        }
+
+    def server_timing(self):
+        return ', '.join((
+            f'db;dur={self.sql * 1000:.1f};desc="{self.query_count} queries"',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'total;dur={self.total * 1000:.1f}',
+        ))
+
+
+def render_timed(request, response):
+    """
+    Рендерит ответ сразу, а не после middleware, учитывая время в замере.
+
+    Нужна представлениям, которым важно, где выполняются ленивые запросы
+    шаблона: process_template_response такой рендеринг не увидит.
+    """
+    started = time.perf_counter()
+    response.render()
+    timing = getattr(request, '_timing', None)
+    if timing is not None:
+        timing.template += time.perf_counter() - started
+    return response
+
+
+class QueryTimingMiddleware:
+    """
+    Замеряет запросы к базе, рендеринг шаблона и общее время ответа.
+
+    Замер выполняется для доли запросов PERFORMANCE_SAMPLE_RATE. Итог
+    отдаётся в заголовке Server-Timing и пишется в лог строкой JSON;
+    ответы с повторяющимися запросами пишутся с уровнем WARNING.
+    Должен стоять первым в MIDDLEWARE, чтобы учесть запросы остальных.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PERFORMANCE_SAMPLE_RATE:
+            return self.get_response(request)
+        timing = request._timing = RequestTiming()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(timing.record_query)
+                )
+            response = self.get_response(request)
+        timing.total = time.perf_counter() - started
+        response['Server-Timing'] = timing.server_timing()
+        self.log(request, response, timing)
+        return response
+
+    def process_template_response(self, request, response):
+        """Засекает рендеринг: он идёт после всех process_template_response."""
+        timing = getattr(request, '_timing', None)
+        if timing is not None and not response.is_rendered:
+            started = time.perf_counter()
+
+            def stop(response):
+                timing.template += time.perf_counter() - started
+
+            response.add_post_render_callback(stop)
+        return response
+
+    def log(self, request, response, timing):
+        duplicates = timing.duplicates()
+        match = request.resolver_match
+        logger.log(
+            logging.WARNING if duplicates else logging.INFO,
+            json.dumps({
+                'view': match.view_name if match else None,
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'queries': timing.query_count,
+                'sql_ms': round(timing.sql * 1000, 2),
+                'template_ms': round(timing.template * 1000, 2),
+                'total_ms': round(timing.total * 1000, 2),
+                'duplicates': [
+                    {'sql': sql[:SQL_IN_LOG_LENGTH], 'count': count}
+                    for sql, count in duplicates.items()
+                ],
+            }, ensure_ascii=False),
+        )
@@ -1,8 +1,18 @@
+import re
+
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
 from pytils.translit import slugify
 
+SLUG_SAVE_ATTEMPTS = 5
+# Запас длины под суффикс вида `-123` у занятых slug.
+SLUG_SUFFIX_RESERVE = 10
+# Ограничивает размер условия WHERE при подборе slug для списка заметок.
+SLUG_BASES_PER_QUERY = 100
+# Основа slug для заголовка, из которого транслитерация ничего не оставила.
+EMPTY_SLUG_BASE = 'note'
+
 
 class Note(models.Model):
     title = models.CharField(
@@ -28,11 +38,90 @@ class Note(models.Model):
         on_delete=models.CASCADE,
     )
 
+    class Meta:
+        ordering = ('id',)
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Сохраняет заметку, подбирая свободный slug, если он не указан.
+
+        Если подобранный slug успели занять параллельным запросом,
+        подбор повторяется.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        for attempt in range(SLUG_SAVE_ATTEMPTS):
+            self.slug = self.free_slug()
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_SAVE_ATTEMPTS - 1:
+                    raise
+
+    def free_slug(self):
+        """Возвращает первый свободный slug из ряда `title`, `title-2`, ..."""
+        return allocate_slugs([slugify(self.title)], exclude_pk=self.pk)[0]
+
+
+def _taken_slugs_condition(base, max_length):
+    """
+    Условие на slug, которые может занять ряд `base`, `base-2`, ...
+
+    Суффикс укорачивает длинную основу, поэтому основ может быть
+    несколько. Диапазон по каждой основе читается по индексу slug,
+    регулярное выражение отсеивает в нём чужие slug вроде `base-x`.
+    """
+    stems = {
+        base[:max_length - len('-') - digits]
+        for digits in range(1, SLUG_SUFFIX_RESERVE)
+    }
+    condition = models.Q(slug=base)
+    for stem in stems:
+        condition |= models.Q(
+            slug__gt=f'{stem}-',
+            slug__lt=f'{stem}.',
+            slug__regex=rf'^{re.escape(stem)}-\d+$',
+        )
+    return condition
+
+
+def allocate_slugs(bases, exclude_pk=None):
+    """
+    Подбирает свободный slug для каждого значения из `bases`.
+
+    Для занятого значения берётся первый свободный вариант из ряда
+    `base`, `base-2`, ... Занятые slug читаются разом для всего списка,
+    а не отдельным запросом на каждый элемент. Повторы внутри списка
+    тоже получают разные slug.
+    """
+    max_length = Note._meta.get_field('slug').max_length
+    bases = [base[:max_length] or EMPTY_SLUG_BASE for base in bases]
+    unique_bases = sorted(set(bases))
+    taken = set()
+    for start in range(0, len(unique_bases), SLUG_BASES_PER_QUERY):
+        condition = models.Q()
+        for base in unique_bases[start:start + SLUG_BASES_PER_QUERY]:
+            condition |= _taken_slugs_condition(base, max_length)
+        taken.update(
+            Note.objects.filter(condition).exclude(
+                pk=exclude_pk
+            ).values_list('slug', flat=True)
+        )
+    slugs = []
+    for base in bases:
+        slug, number = base, 1
+        while slug in taken:
+            number += 1
+            suffix = f'-{number}'
+            slug = base[:max_length - len(suffix)] + suffix
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
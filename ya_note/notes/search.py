@@ -0,0 +1,77 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Note
+
+FTS_TABLE = 'notes_note_fts'
+TOKEN = re.compile(r'\w+')
+# Служебные символы, которыми FTS5 обрамляет совпадения во фрагменте:
+# их не бывает в тексте, поэтому после экранирования фрагмента их можно
+# безопасно заменить на разметку.
+MATCH_START, MATCH_END = '\x02', '\x03'
+SEARCH_SQL = f"""
+    SELECT note.id, note.title, note.slug,
+           snippet({FTS_TABLE}, 1, %s, %s, '…', 12) AS snippet
+    FROM {FTS_TABLE}
+    JOIN notes_note AS note ON note.id = {FTS_TABLE}.rowid
+    WHERE {FTS_TABLE} MATCH %s
+    ORDER BY bm25({FTS_TABLE}, 10.0, 1.0, 0.0)
+    LIMIT %s
+"""
+
+
+def fts_query(author_id, text):
+    """
+    Строит запрос FTS5 из пользовательской строки.
+
+    Каждое слово ищется по префиксу в заголовке и тексте, синтаксис
+    FTS5 из строки не интерпретируется. Поиск ограничен заметками
+    автора.
+    """
+    terms = ' '.join(f'"{token}"*' for token in TOKEN.findall(text.lower()))
+    return f'author_id:"{author_id}" AND ({{title text}}: ({terms}))'
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet).replace(MATCH_START, '<mark>').replace(
+            MATCH_END, '</mark>'
+        )
+    )
+
+
+def search_notes(user, text, limit):
+    """
+    Возвращает до `limit` заметок пользователя, подходящих под запрос.
+
+    Заметки упорядочены по релевантности, у каждой есть атрибут
+    `snippet` с подсвеченным фрагментом текста.
+    """
+    if not TOKEN.search(text):
+        return []
+    if connection.vendor != 'sqlite':
+        notes = list(Note.objects.filter(
+            Q(title__icontains=text) | Q(text__icontains=text), author=user
+        ).only('id', 'title', 'slug')[:limit])
+        for note in notes:
+            note.snippet = ''
+        return notes
+    notes = list(Note.objects.raw(
+        SEARCH_SQL,
+        [MATCH_START, MATCH_END, fts_query(user.pk, text), limit]
+    ))
+    for note in notes:
+        note.snippet = highlight(note.snippet)
+    return notes
+
+
+def rebuild_index():
+    """Перестраивает поисковый индекс по таблице заметок."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+        )
@@ -0,0 +1,25 @@
+"""
+Предварительная компиляция шаблонов.
+
+Копия модуля в соседнем проекте (news/templating.py и notes/templating.py)
+должна оставаться такой же.
+"""
+from pathlib import Path
+
+from django.template import engines
+
+
+def warm_up_templates():
+    """
+    Компилирует все шаблоны из каталогов DIRS.
+
+    С кэширующим загрузчиком первый запрос после запуска не тратит время
+    на разбор шаблонов. Возвращает количество скомпилированных шаблонов.
+    """
+    count = 0
+    for engine in engines.all():
+        for directory in map(Path, engine.dirs):
+            for path in sorted(directory.rglob('*.html')):
+                engine.get_template(path.relative_to(directory).as_posix())
+                count += 1
+    return count
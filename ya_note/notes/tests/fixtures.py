@@ -36,6 +36,9 @@ class BaseTestCase(TestCase):
         cls.note_edit_url = reverse('notes:edit', args=(cls.note.slug,))
         cls.note_delete_url = reverse('notes:delete', args=(cls.note.slug,))
         cls.success_url = reverse('notes:success')
+        cls.search_url = reverse('notes:search')
+        cls.import_url = reverse('notes:import')
+        cls.export_url = reverse('notes:export')
         cls.login_url = reverse('users:login')
         cls.home_url = reverse('notes:home')
         cls.logout_url = reverse('users:logout')
@@ -50,6 +53,9 @@ class BaseTestCase(TestCase):
             cls.notes_url,
             cls.note_add_url,
             cls.success_url,
+            cls.search_url,
+            cls.import_url,
+            cls.export_url,
         )
         cls.pages_for_author = (
             cls.note_detail_url,
@@ -63,4 +69,7 @@ class BaseTestCase(TestCase):
             cls.note_add_url,
             cls.success_url,
             cls.notes_url,
+            cls.search_url,
+            cls.import_url,
+            cls.export_url,
         )
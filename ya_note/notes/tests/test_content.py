@@ -1,6 +1,19 @@
+from http import HTTPStatus
+
+from django.conf import settings
+from django.db import connection
+from django.template import engines
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
 from notes.forms import NoteForm
+from notes.models import Note
+from notes.templating import warm_up_templates
+from yanote import settings_production
 from .fixtures import BaseTestCase
 
+TEMPLATES_DIR = settings.BASE_DIR / 'templates'
+
 
 class ContentTests(BaseTestCase):
     """Класс, тестирующий контент приложения."""
@@ -32,3 +45,91 @@ class ContentTests(BaseTestCase):
                 response = self.author_client.get(url)
                 self.assertIn('form', response.context)
                 self.assertIsInstance(response.context['form'], NoteForm)
+
+    @override_settings(NOTES_COUNT_ON_LIST_PAGE=2)
+    def test_notes_list_keyset_pagination(self):
+        """Список заметок обходится страницами без пропусков и повторов."""
+        Note.objects.bulk_create(
+            Note(
+                title=f'Заметка {index}',
+                text='Текст',
+                slug=f'note-{index}',
+                author=self.author,
+            )
+            for index in range(4)
+        )
+        expected_ids = list(
+            Note.objects.filter(author=self.author).values_list(
+                'id', flat=True
+            )
+        )
+        seen_ids = []
+        url = self.notes_url
+        while url:
+            response = self.author_client.get(url)
+            notes = response.context['object_list']
+            self.assertLessEqual(len(notes), 2)
+            seen_ids.extend(note.id for note in notes)
+            next_cursor = response.context.get('next_cursor')
+            url = next_cursor and f'{self.notes_url}?after={next_cursor}'
+        self.assertEqual(seen_ids, expected_ids)
+
+    def test_notes_list_invalid_cursor(self):
+        """Курсор вне пределов ключей SQLite даёт 404."""
+        for after in ('x', '-1', str(2 ** 63)):
+            with self.subTest(after=after):
+                response = self.author_client.get(
+                    self.notes_url, {'after': after}
+                )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_notes_list_does_not_load_text(self):
+        """Список заметок читается одним запросом без текста заметок."""
+        # Сессия, пользователь и страница заметок.
+        with self.assertNumQueries(3), CaptureQueriesContext(
+                connection
+        ) as context:
+            self.author_client.get(f'{self.notes_url}?after={self.note.id}')
+        self.assertNotIn(
+            '"notes_note"."text"', context.captured_queries[-1]['sql']
+        )
+
+    def test_search_finds_only_own_notes(self):
+        """Поиск находит заметки только текущего пользователя."""
+        Note.objects.create(
+            title='Чужая заметка', text='Текст заметки', author=self.not_author
+        )
+        response = self.author_client.get(self.search_url, {'q': 'текст'})
+        self.assertEqual(list(response.context['object_list']), [self.note])
+
+    def test_search_ranks_and_highlights(self):
+        """Совпадение в заголовке важнее, найденные слова подсвечиваются."""
+        in_text = Note.objects.create(
+            title='Покупки', text='Купить <b>молоко</b>', author=self.author
+        )
+        in_title = Note.objects.create(
+            title='Молоко', text='Не забыть', author=self.author
+        )
+        response = self.author_client.get(self.search_url, {'q': 'молок'})
+        notes = response.context['object_list']
+        self.assertEqual(notes, [in_title, in_text])
+        self.assertEqual(
+            notes[1].snippet, 'Купить &lt;b&gt;<mark>молоко</mark>&lt;/b&gt;'
+        )
+
+    def test_search_ignores_query_syntax(self):
+        """Символы синтаксиса FTS5 в запросе не ломают поиск."""
+        response = self.author_client.get(
+            self.search_url, {'q': '"текст" OR NEAR( *'}
+        )
+        self.assertEqual(list(response.context['object_list']), [])
+
+    def test_templates_warm_up(self):
+        """Прогрев компилирует все шаблоны, запросам остаётся их кэш."""
+        with override_settings(TEMPLATES=settings_production.TEMPLATES):
+            count = warm_up_templates()
+            loader = engines['django'].engine.template_loaders[0]
+            self.assertEqual(count, len(list(TEMPLATES_DIR.rglob('*.html'))))
+            self.assertEqual(len(loader.get_template_cache), count)
+            self.author_client.get(self.notes_url)
+            self.assertEqual(len(loader.get_template_cache), count)
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+from notes.db import pragma_statements
+
+
+class DatabaseTests(TestCase):
+    """Класс, тестирующий настройку соединений с базой."""
+
+    def test_connection_uses_sqlite_pragmas(self):
+        """Новое соединение настраивается значениями из SQLITE_PRAGMAS."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('PRAGMA есть только в SQLite')
+        with connection.cursor() as cursor:
+            for name in ('busy_timeout', 'cache_size'):
+                cursor.execute(f'PRAGMA {name}')
+                with self.subTest(name=name):
+                    self.assertEqual(
+                        cursor.fetchone()[0], settings.SQLITE_PRAGMAS[name]
+                    )
+
+    def test_unknown_pragma_is_rejected(self):
+        """Неизвестные PRAGMA в настройках не выполняются."""
+        with self.assertRaises(ValueError):
+            pragma_statements({'writable_schema': 'ON'})
@@ -1,12 +1,35 @@
+import json
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from io import StringIO
 
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.http import HttpResponse
+from django.test import (
+    Client, RequestFactory, TransactionTestCase, override_settings
+)
+from django.urls import reverse
 from pytils.translit import slugify
 
 from notes.forms import WARNING
-from notes.models import Note
+from notes.middleware import QueryTimingMiddleware
+from notes.models import EMPTY_SLUG_BASE, Note, allocate_slugs
+from notes.search import search_notes
 from .fixtures import BaseTestCase
 
 
+User = get_user_model()
+
+LOCKED_RETRIES = 100
+
+
 class LogicTests(BaseTestCase):
     """Класс, тестирующий логику приложения."""
 
@@ -99,3 +122,223 @@ class LogicTests(BaseTestCase):
         notes_count_after = Note.objects.count()
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertEqual(notes_count_after, notes_count_before)
+
+    def test_empty_slug_gets_free_suffix(self):
+        """Для занятого slug из заголовка подбирается свободный суффикс."""
+        self.form_data.pop('slug')
+        base_slug = slugify(self.form_data['title'])
+        for expected_slug in (base_slug, f'{base_slug}-2', f'{base_slug}-3'):
+            with self.subTest(slug=expected_slug):
+                response = self.author_client.post(
+                    self.note_add_url, self.form_data
+                )
+                self.assertRedirects(response, self.success_url)
+                self.assertTrue(
+                    Note.objects.filter(slug=expected_slug).exists()
+                )
+
+    def test_allocate_slugs_reads_only_its_series(self):
+        """Занятыми считаются только `base` и `base-<число>`."""
+        for slug in ('a', 'a-2', 'a-b', 'ab', 'a-2-3'):
+            Note.objects.create(
+                title='Заметка', text='Текст', slug=slug, author=self.author
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                allocate_slugs(['a', 'a-b', '', '']),
+                ['a-3', 'a-b-2', EMPTY_SLUG_BASE, f'{EMPTY_SLUG_BASE}-2']
+            )
+
+    def test_allocate_slugs_for_long_base(self):
+        """Суффикс укорачивает длинную основу до длины поля."""
+        base = 'x' * Note._meta.get_field('slug').max_length
+        Note.objects.create(
+            title='Заметка', text='Текст', slug=base, author=self.author
+        )
+        Note.objects.create(
+            title='Заметка', text='Текст', slug=base[:-2] + '-2',
+            author=self.author
+        )
+        self.assertEqual(allocate_slugs([base]), [base[:-2] + '-3'])
+
+    def test_search_index_follows_edit_and_delete(self):
+        """Поисковый индекс обновляется при изменении и удалении заметки."""
+        self.author_client.post(self.note_edit_url, data=self.form_data)
+        note = Note.objects.get(id=self.note.id)
+        self.assertEqual(search_notes(self.author, 'заметки', 10), [])
+        self.assertEqual(search_notes(self.author, 'новый', 10), [note])
+        self.author_client.post(
+            reverse('notes:delete', args=(note.slug,))
+        )
+        self.assertEqual(search_notes(self.author, 'новый', 10), [])
+
+    def test_search_ignores_author_id_column(self):
+        """Слово, равное id автора, не находит заметки без этого слова."""
+        self.assertEqual(
+            search_notes(self.author, str(self.author.pk), 10), []
+        )
+        note = Note.objects.create(
+            title=f'Квартира {self.author.pk}', text='Текст',
+            author=self.author
+        )
+        self.assertEqual(
+            search_notes(self.author, str(self.author.pk), 10), [note]
+        )
+
+    def test_rebuild_notes_search(self):
+        """Команда rebuild_notes_search восстанавливает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO notes_note_fts(notes_note_fts) "
+                "VALUES ('delete-all')"
+            )
+        self.assertEqual(search_notes(self.author, 'заметки', 10), [])
+        call_command('rebuild_notes_search', stdout=StringIO())
+        self.assertEqual(
+            search_notes(self.author, 'заметки', 10), [self.note]
+        )
+
+    def test_import_notes(self):
+        """Заметки импортируются из NDJSON с подбором свободных slug."""
+        lines = [
+            {'title': 'Импорт', 'text': 'Первая'},
+            {'title': 'Импорт', 'text': 'Вторая'},
+            {'title': 'Своя', 'text': 'Третья', 'slug': self.note.slug},
+        ]
+        upload = SimpleUploadedFile(
+            'notes.ndjson',
+            '\n'.join(json.dumps(line) for line in lines).encode(),
+        )
+        notes_count_before = Note.objects.count()
+        response = self.author_client.post(
+            self.import_url, {'file': upload}
+        )
+        self.assertRedirects(response, self.success_url)
+        self.assertEqual(Note.objects.count(), notes_count_before + 3)
+        base_slug = slugify('Импорт')
+        self.assertEqual(
+            set(Note.objects.filter(
+                author=self.author, text__in=('Первая', 'Вторая', 'Третья')
+            ).values_list('slug', flat=True)),
+            {base_slug, f'{base_slug}-2', f'{self.note.slug}-2'}
+        )
+
+    def test_import_rejects_invalid_line(self):
+        """Ошибка в любой строке отменяет весь импорт."""
+        upload = SimpleUploadedFile(
+            'notes.ndjson', b'{"title": "1", "text": "2"}\n{"title": 3}\n'
+        )
+        notes_count_before = Note.objects.count()
+        response = self.author_client.post(
+            self.import_url, {'file': upload}
+        )
+        self.assertEqual(Note.objects.count(), notes_count_before)
+        self.assertIn('Строка 2', response.context['form'].errors['file'][0])
+
+    def test_export_streams_own_notes(self):
+        """Экспорт потоком отдаёт только заметки пользователя."""
+        Note.objects.create(
+            title='Чужая', text='Текст', author=self.not_author
+        )
+        response = self.author_client.get(self.export_url)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            [{
+                'title': self.note.title,
+                'text': self.note.text,
+                'slug': self.note.slug,
+            }]
+        )
+
+    def test_import_export_commands_round_trip(self):
+        """Выгруженные командой заметки загружаются обратно командой."""
+        output = StringIO()
+        call_command('export_notes', self.author.username, stdout=output)
+        with tempfile.NamedTemporaryFile(
+                'w', suffix='.ndjson', encoding='utf-8', delete=False
+        ) as file:
+            file.write(output.getvalue())
+        self.addCleanup(os.remove, file.name)
+        call_command(
+            'import_notes', self.not_author.username, file.name,
+            stdout=StringIO()
+        )
+        imported = Note.objects.get(author=self.not_author)
+        self.assertEqual(imported.text, self.note.text)
+        self.assertEqual(imported.slug, f'{self.note.slug}-2')
+
+    def test_generate_notes(self):
+        """Генератор создаёт заметки с уникальными slug."""
+        notes_count_before = Note.objects.count()
+        call_command(
+            'generate_notes', users=5, notes=300, stdout=StringIO()
+        )
+        self.assertEqual(Note.objects.count(), notes_count_before + 300)
+        self.assertEqual(
+            Note.objects.values('slug').distinct().count(),
+            notes_count_before + 300
+        )
+        self.assertTrue(
+            Client().login(username='synthetic-0', password='password')
+        )
+
+    def test_timing_header_and_log(self):
+        """Ответ получает Server-Timing, а в лог пишется строка JSON."""
+        with self.assertLogs('notes.middleware', logging.INFO) as logs:
+            response = self.author_client.get(self.notes_url)
+        self.assertIn('db;dur=', response['Server-Timing'])
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'notes:list')
+        self.assertEqual(record['duplicates'], [])
+
+    def test_timing_flags_repeated_queries(self):
+        """Поштучная загрузка строк отмечается как повтор запроса."""
+        def view(request):
+            for _ in range(3):
+                Note.objects.filter(author=self.author).count()
+            return HttpResponse()
+
+        with self.assertLogs('notes.middleware', logging.INFO) as logs:
+            QueryTimingMiddleware(view)(RequestFactory().get('/'))
+        record = logs.records[-1]
+        duplicates = json.loads(record.getMessage())['duplicates']
+        self.assertEqual(record.levelno, logging.WARNING)
+        self.assertEqual([item['count'] for item in duplicates], [3])
+
+    @override_settings(PERFORMANCE_SAMPLE_RATE=0)
+    def test_timing_is_sampled(self):
+        """Вне выборки ответ не замеряется."""
+        response = self.author_client.get(self.notes_url)
+        self.assertNotIn('Server-Timing', response)
+
+
+class ConcurrentSlugTests(TransactionTestCase):
+    """Класс, тестирующий подбор slug при одновременном создании заметок."""
+
+    def test_concurrent_notes_with_same_title(self):
+        """Одновременно созданные заметки с одним заголовком не конфликтуют."""
+        author = User.objects.create_user(username='Автор')
+        workers = 8
+
+        def create_note(_):
+            try:
+                for _ in range(LOCKED_RETRIES):
+                    try:
+                        return Note.objects.create(
+                            title='Одинаковый заголовок',
+                            text='Текст',
+                            author=author,
+                        ).slug
+                    except OperationalError:
+                        # Общая база в памяти сразу сообщает о блокировке
+                        # таблицы, а не ждёт её снятия, как файловая.
+                        time.sleep(0.01)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            slugs = list(executor.map(create_note, range(workers)))
+        self.assertEqual(len(set(slugs)), workers)
+        self.assertEqual(Note.objects.count(), workers)
@@ -0,0 +1,111 @@
+import os
+import time
+from collections import namedtuple
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes import urls as notes_urls
+from notes.models import Note
+from yanote import urls as project_urls
+
+
+User = get_user_model()
+
+NOTES_PER_USER = 50_000
+
+# Время ответа зависит от машины, поэтому сверяется с бюджетом, только
+# когда задана переменная окружения CHECK_LATENCY. Число запросов к базе
+# проверяется всегда.
+CHECK_LATENCY = bool(os.environ.get('CHECK_LATENCY'))
+
+Budget = namedtuple(
+    'Budget', ('route', 'method', 'user', 'queries', 'ms', 'data'),
+    defaults=(None,)
+)
+
+# Наибольшее число запросов к базе и время ответа для каждого маршрута
+# у пользователя с NOTES_PER_USER заметками.
+BUDGETS = (
+    Budget('notes:home', 'get', 'anonymous', 0, 100),
+    Budget('notes:list', 'get', 'author', 3, 100),
+    Budget('notes:detail', 'get', 'author', 3, 100),
+    Budget('notes:add', 'get', 'author', 2, 100),
+    Budget('notes:add', 'post', 'author', 7, 100, {
+        'title': 'Новая заметка', 'text': 'Текст', 'slug': '',
+    }),
+    Budget('notes:edit', 'get', 'author', 3, 100),
+    Budget('notes:edit', 'post', 'author', 5, 100, {
+        'title': 'Правка', 'text': 'Текст', 'slug': 'note-0',
+    }),
+    Budget('notes:delete', 'get', 'author', 3, 100),
+    Budget('notes:delete', 'post', 'author', 4, 100),
+    Budget('notes:success', 'get', 'author', 2, 100),
+    Budget('notes:search', 'get', 'author', 3, 300, {'q': 'заметка'}),
+    Budget('notes:import', 'get', 'author', 2, 100),
+    Budget('notes:export', 'get', 'author', 3, 2000),
+    Budget('users:login', 'get', 'anonymous', 0, 100),
+    Budget('users:logout', 'get', 'author', 4, 100),
+    Budget('users:signup', 'get', 'anonymous', 0, 100),
+)
+ROUTE_ARGS = {
+    'notes:detail': ['note-0'],
+    'notes:edit': ['note-0'],
+    'notes:delete': ['note-0'],
+}
+
+
+class RouteBudgetTests(TestCase):
+    """Класс, проверяющий число запросов и время ответа маршрутов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Автор')
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=f'Заметка {index}',
+                    text='Текст заметки',
+                    slug=f'note-{index}',
+                    author=cls.author,
+                )
+                for index in range(NOTES_PER_USER)
+            ),
+            batch_size=5000,
+        )
+
+    def test_every_route_has_budget(self):
+        """Новый маршрут не останется без бюджета."""
+        routes = {
+            f'notes:{pattern.name}' for pattern in notes_urls.urlpatterns
+        } | {
+            f'users:{pattern.name}' for pattern in project_urls.auth_urls[0]
+        }
+        self.assertEqual({budget.route for budget in BUDGETS}, routes)
+
+    def test_route_budgets(self):
+        """Маршруты укладываются в число запросов и время ответа."""
+        for budget in BUDGETS:
+            with self.subTest(budget=budget), transaction.atomic():
+                self.request(budget)
+                transaction.set_rollback(True)
+
+    def request(self, budget):
+        client = Client()
+        if budget.user == 'author':
+            client.force_login(self.author)
+        url = reverse(budget.route, args=ROUTE_ARGS.get(budget.route))
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = getattr(client, budget.method)(url, data=budget.data)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            elapsed = (time.perf_counter() - started) * 1000
+        self.assertLess(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertLessEqual(len(queries), budget.queries)
+        if CHECK_LATENCY:
+            self.assertLess(elapsed, budget.ms)
@@ -0,0 +1,110 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_slug
+from django.db import IntegrityError, transaction
+from pytils.translit import slugify
+
+from .models import SLUG_SAVE_ATTEMPTS, Note, allocate_slugs
+
+EXPORT_FIELDS = ('title', 'text', 'slug')
+TITLE_MAX_LENGTH = Note._meta.get_field('title').max_length
+SLUG_MAX_LENGTH = Note._meta.get_field('slug').max_length
+
+
+def parse_note(line, number):
+    """
+    Разбирает одну строку NDJSON в словарь с полями заметки.
+
+    При ошибке выбрасывает ValueError с номером строки.
+    """
+    try:
+        data = json.loads(line)
+    except ValueError:
+        raise ValueError(f'Строка {number}: некорректный JSON.')
+    if not isinstance(data, dict):
+        raise ValueError(f'Строка {number}: ожидается объект.')
+    title = data.get('title', Note._meta.get_field('title').default)
+    text = data.get('text')
+    slug = data.get('slug') or ''
+    if not isinstance(text, str) or not text:
+        raise ValueError(f'Строка {number}: не указан текст заметки.')
+    if not isinstance(title, str) or len(title) > TITLE_MAX_LENGTH:
+        raise ValueError(f'Строка {number}: некорректный заголовок.')
+    if slug:
+        try:
+            validate_slug(slug)
+        except ValidationError:
+            raise ValueError(f'Строка {number}: некорректный slug.')
+        if len(slug) > SLUG_MAX_LENGTH:
+            raise ValueError(f'Строка {number}: слишком длинный slug.')
+    return {'title': title, 'text': text, 'slug': slug}
+
+
+def create_notes(author, rows):
+    """
+    Создаёт заметки одним bulk_create, заранее подобрав им slug.
+
+    Занятый slug заменяется свободным вариантом с суффиксом. Если slug
+    успели занять параллельно, подбор и вставка повторяются.
+    """
+    for attempt in range(SLUG_SAVE_ATTEMPTS):
+        slugs = allocate_slugs(
+            [row['slug'] or slugify(row['title']) for row in rows]
+        )
+        try:
+            with transaction.atomic():
+                Note.objects.bulk_create(
+                    Note(
+                        title=row['title'],
+                        text=row['text'],
+                        slug=slug,
+                        author=author,
+                    )
+                    for row, slug in zip(rows, slugs)
+                )
+            return
+        except IntegrityError:
+            if attempt == SLUG_SAVE_ATTEMPTS - 1:
+                raise
+
+
+def import_notes(author, lines, batch_size):
+    """
+    Импортирует заметки автора из строк NDJSON пачками по `batch_size`.
+
+    Строки читаются по одной, поэтому в памяти держится только текущая
+    пачка. Весь импорт выполняется в одной транзакции: при ошибке в любой
+    строке ни одна заметка не сохраняется. Возвращает число заметок.
+    """
+    count = 0
+    batch = []
+    with transaction.atomic():
+        for number, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            if not line.strip():
+                continue
+            batch.append(parse_note(line, number))
+            if len(batch) >= batch_size:
+                create_notes(author, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            create_notes(author, batch)
+            count += len(batch)
+    return count
+
+
+def export_notes(author, chunk_size):
+    """
+    Выдаёт заметки автора строками NDJSON.
+
+    Заметки читаются из базы порциями по `chunk_size` в виде словарей,
+    без создания объектов моделей.
+    """
+    notes = Note.objects.filter(author=author).order_by('id').values(
+        *EXPORT_FIELDS
+    )
+    for note in notes.iterator(chunk_size=chunk_size):
+        yield json.dumps(note, ensure_ascii=False) + '\n'
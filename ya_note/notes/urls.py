@@ -12,4 +12,7 @@ urlpatterns = [
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
     path('notes/', views.NotesList.as_view(), name='list'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('search/', views.NoteSearch.as_view(), name='search'),
+    path('import/', views.NotesImport.as_view(), name='import'),
+    path('export/', views.NotesExport.as_view(), name='export'),
 ]
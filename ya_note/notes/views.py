@@ -1,9 +1,17 @@
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, StreamingHttpResponse
 from django.urls import reverse_lazy
 from django.views import generic
 
-from .forms import NoteForm
+from .forms import NoteForm, NotesImportForm
 from .models import Note
+from .search import search_notes
+from .transfer import export_notes, import_notes
+
+INVALID_CURSOR = 'Некорректный курсор страницы.'
+# Наибольшее целое, которое SQLite принимает как параметр запроса.
+MAX_PK = 2 ** 63 - 1
 
 
 class Home(generic.TemplateView):
@@ -49,11 +57,94 @@ class NoteDelete(NoteBase, generic.DeleteView):
     template_name = 'notes/delete.html'
 
 
+def parse_cursor(value):
+    """Возвращает id из курсора страницы в пределах ключей SQLite."""
+    try:
+        value = int(value)
+    except ValueError:
+        raise Http404(INVALID_CURSOR)
+    if not 0 <= value <= MAX_PK:
+        raise Http404(INVALID_CURSOR)
+    return value
+
+
 class NotesList(NoteBase, generic.ListView):
-    """Список всех заметок пользователя."""
+    """
+    Список всех заметок пользователя.
+
+    Заметки выводятся страницами по возрастанию id. Следующая страница
+    начинается после id из параметра `after`, поэтому дальние страницы
+    не медленнее первой. Текст заметок из базы не загружается.
+    """
     template_name = 'notes/list.html'
 
+    def get_queryset(self):
+        queryset = super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
+        after = self.request.GET.get('after')
+        if after:
+            queryset = queryset.filter(id__gt=parse_cursor(after))
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        per_page = settings.NOTES_COUNT_ON_LIST_PAGE
+        notes = list(self.object_list[:per_page + 1])
+        context = super().get_context_data(
+            object_list=notes[:per_page], **kwargs
+        )
+        if len(notes) > per_page:
+            context['next_cursor'] = notes[per_page - 1].id
+        return context
+
 
 class NoteDetail(NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NoteSearch(LoginRequiredMixin, generic.TemplateView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get('q', '').strip()
+        context['query'] = query
+        context['object_list'] = search_notes(
+            self.request.user, query, settings.NOTES_SEARCH_RESULTS_COUNT
+        ) if query else []
+        return context
+
+
+class NotesImport(LoginRequiredMixin, generic.FormView):
+    """Импорт заметок пользователя из файла NDJSON."""
+    template_name = 'notes/import.html'
+    form_class = NotesImportForm
+    success_url = reverse_lazy('notes:success')
+
+    def form_valid(self, form):
+        try:
+            import_notes(
+                self.request.user,
+                form.cleaned_data['file'],
+                settings.NOTES_IMPORT_BATCH_SIZE,
+            )
+        except (ValueError, UnicodeDecodeError) as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        return super().form_valid(form)
+
+
+class NotesExport(LoginRequiredMixin, generic.View):
+    """Выгрузка всех заметок пользователя в формате NDJSON."""
+
+    def get(self, request, *args, **kwargs):
+        response = StreamingHttpResponse(
+            export_notes(request.user, settings.NOTES_EXPORT_CHUNK_SIZE),
+            content_type='application/x-ndjson; charset=utf-8',
+        )
+        response['Content-Disposition'] = (
+            'attachment; filename="notes.ndjson"'
+        )
+        return response
@@ -22,6 +22,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.middleware.QueryTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,6 +50,9 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать шаблоны при запуске, см. settings_production.
+TEMPLATES_WARM_UP = False
+
 WSGI_APPLICATION = 'yanote.wsgi.application'
 
 
@@ -56,9 +60,19 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 60,
     }
 }
 
+# Применяются к каждому новому соединению, см. db.apply_sqlite_pragmas.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +101,29 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_LIST_PAGE = 50
+
+NOTES_SEARCH_RESULTS_COUNT = 20
+
+NOTES_IMPORT_BATCH_SIZE = 1000
+
+NOTES_EXPORT_CHUNK_SIZE = 2000
+
+# Доля ответов, для которых собираются число запросов и время,
+# см. notes.middleware.QueryTimingMiddleware.
+PERFORMANCE_SAMPLE_RATE = 1
+
+# Столько одинаковых запросов за ответ считаются признаком N+1.
+PERFORMANCE_DUPLICATE_QUERIES = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'notes.middleware': {'handlers': ['console'], 'level': 'INFO'},
+    },
+}